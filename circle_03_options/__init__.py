@@ -22,7 +22,7 @@
 bl_info = {
 	"name": "CircleObjects",
 	"author": "Michel Anders (varkenvarken)",
-	"version": (0, 0, 201601071058),
+	"version": (0, 1, 202610181200),
 	"blender": (2, 76, 0),
 	"location": "View3D > Object > Circle",
 	"description": "Arranges selected objects in a circle",
@@ -31,12 +31,174 @@ bl_info = {
 	"tracker_url": "",
 	"category": "Object"}
 
+from itertools import chain
+from math import fsum
+
 import bpy
-from mathutils import Vector
+import bgl
+from mathutils import Vector, Matrix
 from bpy.props import FloatProperty
 from bpy.props import FloatVectorProperty
 from bpy.props import EnumProperty
 
+import numpy as np
+
+def gather_locations(objects):
+	# read all locations into an (N,3) array in a single pass
+	flat = chain.from_iterable(ob.location for ob in objects)
+	return np.fromiter(flat, dtype=np.float64, count=3 * len(objects)).reshape(-1, 3)
+
+def write_locations(objects, locations):
+	# assign all locations in a single pass, assigning through the property
+	# (instead of a driver or matrix) keeps the dependency graph up to date
+	for ob, loc in zip(objects, locations.tolist()):
+		ob.location = loc
+
+# when a property is changed in the redo panel Blender undoes the operator and
+# executes it again on the same selection. the center does not depend on the
+# properties and the radius and directions only on the orientation, so we keep
+# them from the first execute and only apply the new scale and rotation on a
+# redo. invoke() clears the cache so a fresh run from the menu always starts over
+redo_cache = {}
+
+def compensated_mean(values):
+	# fsum is exactly rounded, and summing offsets from the first value keeps
+	# the terms small, so objects kilometres from the origin keep their precision
+	reference = values[0]
+	return reference + fsum(values - reference) / len(values)
+
+def selection_stats(objects, rotation):
+	# rotation is a 3x3 array whose columns are the two axes spanning the
+	# circle plane and the circle axis.
+	# the only pass over the objects themselves, everything after this works
+	# on the gathered array. the whole array is compared with the cached one
+	# because a script (which never calls invoke()) may have moved any object
+	# between two execute calls, this costs no more than the write that follows
+	names = tuple(ob.name for ob in objects)
+	xyz = gather_locations(objects)
+	if redo_cache.get('names') != names or not np.array_equal(redo_cache['xyz'], xyz):
+		center = np.array([compensated_mean(xyz[:, i]) for i in range(3)])
+		redo_cache.clear()
+		redo_cache.update(names=names, xyz=xyz, center=center, delta=xyz - center)
+
+	plane = rotation.tobytes()
+	if redo_cache.get('plane') != plane:
+		# project onto the plane perpendicular to the axis, expressed in
+		# the (u, v, axis) frame of the circle
+		local = redo_cache['delta'].dot(rotation)
+		distance = np.hypot(local[:, 0], local[:, 1])
+		# the unit directions in the circle plane (objects on the axis stay there)
+		direction = np.zeros_like(local)
+		nonzero = distance > 0
+		direction[nonzero, :2] = local[nonzero, :2] / distance[nonzero, None]
+		# anything derived from the previous plane is stale now
+		for key in [key for key in redo_cache if key.startswith('direction_')]:
+			del redo_cache[key]
+		redo_cache.update(plane=plane, radius=fsum(distance) / len(distance),
+						  distance=distance, height=local[:, 2], direction=direction)
+	return redo_cache
+
+def circular_median(angles):
+	# the angle that minimizes the summed arc distance to all angles. the cost is
+	# piecewise linear with its minimum at one of the angles, so we evaluate all
+	# of them at once with prefix sums over the sorted angles, O(N log N)
+	n = len(angles)
+	a = np.sort(np.mod(angles, 2 * np.pi))
+	unrolled = np.concatenate((a - 2 * np.pi, a, a + 2 * np.pi))
+	cumulative = np.concatenate(([0], np.cumsum(unrolled)))
+	# for every candidate the n angles within half a turn on either side
+	lo = np.searchsorted(unrolled, a - np.pi, side='right')
+	mid = np.searchsorted(unrolled, a, side='right')
+	hi = lo + n
+	before = a * (mid - lo) - (cumulative[mid] - cumulative[lo])
+	after = (cumulative[hi] - cumulative[mid]) - a * (hi - mid)
+	return a[np.argmin(before + after)]
+
+def even_directions(direction, exact=False):
+	# evenly spaced directions, assigned to the objects in the order of their
+	# current angle. an assignment that keeps the angular order never has
+	# crossing paths, only the phase of the slots is left to choose:
+	# - by default the circular mean of the offsets, which minimizes the summed
+	#   squared displacement of the directions
+	# - exact, the circular median, which gives the minimal total angular travel.
+	#   for arc length costs an optimal matching between points on a circle is
+	#   always a rotation of the sorted order (Werman et al. 1986) so this is the
+	#   optimum over all possible assignments, not just the sorted ones
+	n = len(direction)
+	theta = np.arctan2(direction[:, 1], direction[:, 0])
+	order = np.argsort(theta, kind='mergesort')
+	slots = 2 * np.pi * np.arange(n) / n
+	offset = theta[order] - slots
+	if exact:
+		phase = circular_median(offset)
+	else:
+		phase = np.arctan2(np.sin(offset).sum(), np.cos(offset).sum())
+	angles = np.empty(n)
+	angles[order] = phase + slots
+	return np.column_stack((np.cos(angles), np.sin(angles), np.zeros(n)))
+
+golden_angle = np.pi * (3 - np.sqrt(5))
+
+def ring_offsets(distance, theta):
+	# concentric rings at radius k/K, ring k holding at most floor(2 pi k) objects
+	# so neighbours on every ring are about as far apart as the rings themselves.
+	# objects fill the rings inside out by distance, and go round each ring in
+	# the order of their current angle
+	n = len(distance)
+	capacity = np.floor(2 * np.pi * np.arange(1, int(np.sqrt(n / np.pi)) + 3)).astype(int)
+	end = np.cumsum(capacity)
+	rings = np.searchsorted(end, n) + 1
+	start = end - capacity
+	count = np.minimum(capacity, n - start)[:rings]
+
+	ring = np.empty(n, dtype=int)
+	ring[np.argsort(distance, kind='mergesort')] = np.searchsorted(end, np.arange(n), side='right')
+	order = np.lexsort((theta, ring))
+	slot = np.empty(n, dtype=int)
+	slot[order] = np.arange(n) - start[ring[order]]
+
+	radius = (ring + 1) / float(rings)
+	angle = 2 * np.pi * slot / count[ring]
+	return np.column_stack((radius * np.cos(angle), radius * np.sin(angle), np.zeros(n)))
+
+def spiral_offsets(distance):
+	# a fibonacci disk, evenly filled, with the objects closest to the
+	# center placed closest to the center
+	n = len(distance)
+	i = np.empty(n)
+	i[np.argsort(distance, kind='mergesort')] = np.arange(n)
+	radius = np.sqrt((i + 0.5) / n)
+	angle = i * golden_angle
+	return np.column_stack((radius * np.cos(angle), radius * np.sin(angle), np.zeros(n)))
+
+def sphere_offsets(height):
+	# a fibonacci sphere with the lowest objects at the bottom
+	n = len(height)
+	i = np.empty(n)
+	i[np.argsort(height, kind='mergesort')] = np.arange(n)
+	z = (2 * i + 1) / n - 1
+	radius = np.sqrt(1 - z * z)
+	angle = i * golden_angle
+	return np.column_stack((radius * np.cos(angle), radius * np.sin(angle), z))
+
+def placement_directions(stats, arrangement, distribution):
+	# the offsets (relative to the scaled radius) depend only on the selection
+	# so they are cached along with the other statistics
+	if arrangement == 'CIRCLE' and distribution == 'KEEP':
+		return stats['direction']
+	key = 'direction_' + (distribution if arrangement == 'CIRCLE' else arrangement)
+	if key not in stats:
+		direction = stats['direction']
+		if arrangement == 'CIRCLE':
+			stats[key] = even_directions(direction, exact=(distribution == 'EXACT'))
+		elif arrangement == 'RINGS':
+			stats[key] = ring_offsets(stats['distance'], np.arctan2(direction[:, 1], direction[:, 0]))
+		elif arrangement == 'SPIRAL':
+			stats[key] = spiral_offsets(stats['distance'])
+		else:
+			stats[key] = sphere_offsets(stats['height'])
+	return stats[key]
+
 class CircleObjects(bpy.types.Operator):
 	"""Arrange selected objects in a circle"""
 	bl_idname = "object.circle_objects"
@@ -63,6 +225,23 @@ class CircleObjects(bpy.types.Operator):
 								 ('A','Arbitrary Axis','Arbitrary Axis')],
 								default='Z')
 
+	distribution = EnumProperty(	name="Distribution",
+								description="How objects are placed along the circle",
+								items=[
+								 ('KEEP','Keep angles','Keep the current angle of each object around the center'),
+								 ('EVEN','Even','Space objects evenly, in the order of their current angle'),
+								 ('EXACT','Even, least travel','Space objects evenly with the least total angular travel')],
+								default='KEEP')
+
+	arrangement = EnumProperty(	name="Arrangement",
+								description="The shape to arrange the objects in",
+								items=[
+								 ('CIRCLE','Circle','A single circle'),
+								 ('RINGS','Rings','Concentric rings, filled inside out'),
+								 ('SPIRAL','Spiral','An evenly filled disk (fibonacci spiral)'),
+								 ('SPHERE','Sphere','An evenly covered sphere (fibonacci sphere)')],
+								default='CIRCLE')
+
 	cardinals = { 'X' : Vector((1,0,0)),
 				  'Y' : Vector((0,1,0)),
 				  'Z' : Vector((0,0,1))  }
@@ -72,20 +251,26 @@ class CircleObjects(bpy.types.Operator):
 		return (	(len(context.selected_objects) > 2) 
 				and (context.mode == 'OBJECT')	)
 
-	def execute(self, context):
-		xyz = [ob.location for ob in context.selected_objects]
-		center = sum(xyz, Vector()) / len(xyz)
-		radius = sum((loc.xy - center.xy).length for loc in xyz)
-		radius /= len(xyz)
+	def rotation(self):
+		# the rotation that takes the z-axis to the circle axis
 		if self.orientation in self.cardinals:
 			orientation = self.cardinals[self.orientation]
 		else:
 			orientation = self.axis
-		rotation = self.cardinals['Z'].rotation_difference(orientation)
-		for loc, ob in zip(xyz, context.selected_objects):
-			direction = (loc.xy - center.xy).normalized().to_3d()
-			direction = rotation * direction
-			ob.location = center + self.scale * 0.01 * radius * direction
+		return self.cardinals['Z'].rotation_difference(orientation).to_matrix()
+
+	def invoke(self, context, event):
+		redo_cache.clear()
+		return self.execute(context)
+
+	def execute(self, context):
+		objects = context.selected_objects
+		rotation = np.array(self.rotation())
+		stats = selection_stats(objects, rotation)
+		# scale and rotation combined in a single linear map applied to all directions
+		transform = self.scale * 0.01 * stats['radius'] * rotation.T
+		direction = placement_directions(stats, self.arrangement, self.distribution)
+		write_locations(objects, stats['center'] + direction.dot(transform))
 		return {'FINISHED'}
 
 	def draw(self, context):
@@ -94,6 +279,120 @@ class CircleObjects(bpy.types.Operator):
 		layout.prop(self, 'orientation')
 		if self.orientation == 'A':
 			layout.prop(self, 'axis', text="")
+		layout.prop(self, 'arrangement')
+		if self.arrangement == 'CIRCLE':
+			layout.prop(self, 'distribution')
+
+def draw_preview(op, context):
+	# draw the circle (and where the first objects will end up) as an overlay,
+	# during the interaction nothing but this drawing changes
+	center = op.stats['center']
+	transform = op.transform()
+	angles = np.linspace(0, 2 * np.pi, 64, endpoint=False)
+	circle = center + np.column_stack((np.cos(angles), np.sin(angles), np.zeros(64))).dot(transform)
+	direction = placement_directions(op.stats, op.arrangement, op.distribution)
+	points = center + direction[:op.preview_limit].dot(transform)
+
+	bgl.glEnable(bgl.GL_BLEND)
+	bgl.glColor4f(1.0, 0.6, 0.0, 0.8)
+	bgl.glLineWidth(2)
+	bgl.glBegin(bgl.GL_LINE_LOOP)
+	for co in circle.tolist():
+		bgl.glVertex3f(*co)
+	bgl.glEnd()
+	bgl.glPointSize(5)
+	bgl.glBegin(bgl.GL_POINTS)
+	for co in points.tolist():
+		bgl.glVertex3f(*co)
+	bgl.glEnd()
+
+	# restore opengl defaults
+	bgl.glPointSize(1)
+	bgl.glLineWidth(1)
+	bgl.glDisable(bgl.GL_BLEND)
+	bgl.glColor4f(0.0, 0.0, 0.0, 1.0)
+
+class CircleObjectsModal(bpy.types.Operator):
+	"""Arrange selected objects in a circle, drag to scale and rotate the circle"""
+	bl_idname = "object.circle_objects_modal"
+	bl_label = "Circle objects interactively"
+	bl_options = {'REGISTER', 'UNDO'}
+
+	scale = CircleObjects.scale
+	axis = CircleObjects.axis
+	orientation = CircleObjects.orientation
+	distribution = CircleObjects.distribution
+	arrangement = CircleObjects.arrangement
+	spin = FloatProperty(	name="Spin",
+							description="Rotation of the circle around its axis",
+							default=0,
+							subtype='ANGLE')
+
+	cardinals = CircleObjects.cardinals
+
+	# the number of objects whose future location is shown in the preview
+	preview_limit = 1000
+
+	@classmethod
+	def poll(cls, context):
+		return CircleObjects.poll(context)
+
+	rotation = CircleObjects.rotation
+
+	def transform(self):
+		# the linear map from the cached unit directions to the offsets from the center
+		rotation = self.rotation() * Matrix.Rotation(self.spin, 3, 'Z')
+		return self.scale * 0.01 * self.stats['radius'] * np.array(rotation).T
+
+	def execute(self, context):
+		# called once when the interaction is confirmed and again on every redo
+		objects = context.selected_objects
+		self.stats = selection_stats(objects, np.array(self.rotation()))
+		direction = placement_directions(self.stats, self.arrangement, self.distribution)
+		write_locations(objects, self.stats['center'] + direction.dot(self.transform()))
+		return {'FINISHED'}
+
+	def invoke(self, context, event):
+		if context.area.type != 'VIEW_3D':
+			self.report({'WARNING'}, "Must be run from a 3D view")
+			return {'CANCELLED'}
+		redo_cache.clear()
+		self.stats = selection_stats(context.selected_objects, np.array(self.rotation()))
+		self.start = (event.mouse_x, event.mouse_y, self.scale, self.spin)
+		self.handle = bpy.types.SpaceView3D.draw_handler_add(draw_preview, (self, context), 'WINDOW', 'POST_VIEW')
+		context.window_manager.modal_handler_add(self)
+		self.update_header(context)
+		return {'RUNNING_MODAL'}
+
+	def modal(self, context, event):
+		context.area.tag_redraw()
+		if event.type == 'MOUSEMOVE':
+			# horizontal movement scales, vertical movement spins the circle
+			x, y, scale, spin = self.start
+			self.scale = max(0, scale + (event.mouse_x - x) * 0.5)
+			self.spin = spin + (event.mouse_y - y) * 0.01
+			self.update_header(context)
+		elif event.type in self.cardinals and event.value == 'PRESS':
+			self.orientation = event.type
+			self.stats = selection_stats(context.selected_objects, np.array(self.rotation()))
+			self.update_header(context)
+		elif event.type in {'LEFTMOUSE', 'RET', 'NUMPAD_ENTER'} and event.value == 'PRESS':
+			# the only moment the objects are actually moved
+			self.finish(context)
+			return self.execute(context)
+		elif event.type in {'RIGHTMOUSE', 'ESC'} and event.value == 'PRESS':
+			self.finish(context)
+			return {'CANCELLED'}
+		return {'RUNNING_MODAL'}
+
+	def update_header(self, context):
+		context.area.header_text_set("Scale: %.0f%%  Spin: %.1f°  Orientation: %s  (X/Y/Z to orient, click to confirm, Esc to cancel)"
+									% (self.scale, np.degrees(self.spin), self.orientation))
+
+	def finish(self, context):
+		bpy.types.SpaceView3D.draw_handler_remove(self.handle, 'WINDOW')
+		context.area.header_text_set()
+		context.area.tag_redraw()
 
 preview_collections = {}
 
@@ -131,6 +430,7 @@ def menu_func(self, context):
 			icon_value=preview_collections['icons']['circle_icon'].icon_id)
 	else:
 		self.layout.operator(CircleObjects.bl_idname, icon='PLUGIN')
+	self.layout.operator(CircleObjectsModal.bl_idname, icon='PLUGIN')
 
 if __name__ == "__main__":
 	register()
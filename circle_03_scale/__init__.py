@@ -22,7 +22,7 @@
 bl_info = {
 	"name": "CircleObjects",
 	"author": "Michel Anders (varkenvarken)",
-	"version": (0, 0, 201601071109),
+	"version": (0, 1, 202610181300),
 	"blender": (2, 76, 0),
 	"location": "View3D > Object > Circle",
 	"description": "Arranges selected objects in a circle",
@@ -32,9 +32,21 @@ bl_info = {
 	"category": "Object"}
 
 import bpy
-from mathutils import Vector
+import bgl
+from math import pi, cos, sin, degrees
+from mathutils import Vector, Matrix
 from bpy.props import FloatProperty
 
+def circle_layout(objects):
+	# the center and mean radius of the objects in the xy plane and the
+	# direction of each object as seen from the center
+	xyz = [ob.location.copy() for ob in objects]
+	center = sum(xyz, Vector()) / len(xyz)
+	radius = sum((loc.xy - center.xy).length for loc in xyz)
+	radius /= len(xyz)
+	directions = [(loc.xy - center.xy).normalized().to_3d() for loc in xyz]
+	return center, radius, directions
+
 class CircleObjects(bpy.types.Operator):
 	"""Arrange selected objects in a circle in the xy plane"""
 	bl_idname = "object.circle_objects"
@@ -53,15 +65,103 @@ class CircleObjects(bpy.types.Operator):
 				and (context.mode == 'OBJECT')	)
 
 	def execute(self, context):
-		xyz = [ob.location for ob in context.selected_objects]
-		center = sum(xyz, Vector()) / len(xyz)
-		radius = sum((loc.xy - center.xy).length for loc in xyz)
-		radius /= len(xyz)
-		for loc, ob in zip(xyz, context.selected_objects):
-			direction = (loc.xy - center.xy).normalized().to_3d()
+		objects = context.selected_objects
+		center, radius, directions = circle_layout(objects)
+		for direction, ob in zip(directions, objects):
 			ob.location = center + self.scale * 0.01 * radius * direction
 		return {'FINISHED'}
 
+def draw_preview(op, context):
+	# draw the circle (and where the first objects will end up) as an overlay
+	# so that no object has to be moved while the user is still dragging
+	center, radius, directions = op.layout_data
+	transform = op.scale * 0.01 * radius * Matrix.Rotation(op.spin, 3, 'Z')
+
+	bgl.glEnable(bgl.GL_BLEND)
+	bgl.glColor4f(1.0, 0.6, 0.0, 0.8)
+	bgl.glLineWidth(2)
+	bgl.glBegin(bgl.GL_LINE_LOOP)
+	for i in range(64):
+		a = 2 * pi * i / 64
+		bgl.glVertex3f(*(center + transform * Vector((cos(a), sin(a), 0))))
+	bgl.glEnd()
+	bgl.glPointSize(5)
+	bgl.glBegin(bgl.GL_POINTS)
+	for direction in directions[:op.preview_limit]:
+		bgl.glVertex3f(*(center + transform * direction))
+	bgl.glEnd()
+
+	# restore opengl defaults
+	bgl.glPointSize(1)
+	bgl.glLineWidth(1)
+	bgl.glDisable(bgl.GL_BLEND)
+	bgl.glColor4f(0.0, 0.0, 0.0, 1.0)
+
+class CircleObjectsModal(bpy.types.Operator):
+	"""Arrange selected objects in a circle in the xy plane, drag to scale and rotate the circle"""
+	bl_idname = "object.circle_objects_modal"
+	bl_label = "Circle objects interactively"
+	bl_options = {'REGISTER', 'UNDO'}
+
+	scale = CircleObjects.scale
+	spin = FloatProperty(	name="Spin",
+							description="Rotation of the circle around its axis",
+							default=0,
+							subtype='ANGLE')
+
+	# the number of objects whose future location is shown in the preview
+	preview_limit = 1000
+
+	@classmethod
+	def poll(cls, context):
+		return CircleObjects.poll(context)
+
+	def execute(self, context):
+		# called once when the interaction is confirmed and again on every redo
+		objects = context.selected_objects
+		center, radius, directions = circle_layout(objects)
+		transform = self.scale * 0.01 * radius * Matrix.Rotation(self.spin, 3, 'Z')
+		for direction, ob in zip(directions, objects):
+			ob.location = center + transform * direction
+		return {'FINISHED'}
+
+	def invoke(self, context, event):
+		if context.area.type != 'VIEW_3D':
+			self.report({'WARNING'}, "Must be run from a 3D view")
+			return {'CANCELLED'}
+		self.layout_data = circle_layout(context.selected_objects)
+		self.start = (event.mouse_x, event.mouse_y, self.scale, self.spin)
+		self.handle = bpy.types.SpaceView3D.draw_handler_add(draw_preview, (self, context), 'WINDOW', 'POST_VIEW')
+		context.window_manager.modal_handler_add(self)
+		self.update_header(context)
+		return {'RUNNING_MODAL'}
+
+	def modal(self, context, event):
+		context.area.tag_redraw()
+		if event.type == 'MOUSEMOVE':
+			# horizontal movement scales, vertical movement spins the circle
+			x, y, scale, spin = self.start
+			self.scale = max(0, scale + (event.mouse_x - x) * 0.5)
+			self.spin = spin + (event.mouse_y - y) * 0.01
+			self.update_header(context)
+		elif event.type in {'LEFTMOUSE', 'RET', 'NUMPAD_ENTER'} and event.value == 'PRESS':
+			# the only moment the objects are actually moved
+			self.finish(context)
+			return self.execute(context)
+		elif event.type in {'RIGHTMOUSE', 'ESC'} and event.value == 'PRESS':
+			self.finish(context)
+			return {'CANCELLED'}
+		return {'RUNNING_MODAL'}
+
+	def update_header(self, context):
+		context.area.header_text_set("Scale: %.0f%%  Spin: %.1f°  (click to confirm, Esc to cancel)"
+									% (self.scale, degrees(self.spin)))
+
+	def finish(self, context):
+		bpy.types.SpaceView3D.draw_handler_remove(self.handle, 'WINDOW')
+		context.area.header_text_set()
+		context.area.tag_redraw()
+
 preview_collections = {}
 
 def load_icon():
@@ -98,6 +198,7 @@ def menu_func(self, context):
 			icon_value=preview_collections['icons']['circle_icon'].icon_id)
 	else:
 		self.layout.operator(CircleObjects.bl_idname, icon='PLUGIN')
+	self.layout.operator(CircleObjectsModal.bl_idname, icon='PLUGIN')
 
 if __name__ == "__main__":
 	register()
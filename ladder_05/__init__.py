@@ -0,0 +1,662 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  Ladder, a Blender addon
+#  (c) 2016 Michel J. Anders (varkenvarken)
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+bl_info = {
+	"name": "Ladder",
+	"author": "Michel Anders (varkenvarken)",
+	"version": (0, 0, 201607271133),
+	"blender": (2, 76, 0),
+	"location": "View3D > Add > Mesh > Ladder",
+	"description": "Adds a ladder mesh object to the scene",
+	"warning": "",
+	"wiki_url": "",
+	"tracker_url": "",
+	"category": "Add Mesh"}
+
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+import bmesh
+from bpy.props import FloatProperty, IntProperty, BoolProperty, StringProperty
+from bpy.app.handlers import persistent
+
+import numpy as np
+
+from . import kernel
+
+def clear_mesh(me):
+	# Mesh.clear_geometry() does not exist in 2.76, writing an empty bmesh is the
+	# cheapest way to get rid of all vertices, edges and faces
+	bm = bmesh.new()
+	bm.to_mesh(me)
+	bm.free()
+
+def grow_mesh(me, geom):
+	# add elements until the mesh has as many as geom, existing elements are kept
+	me.vertices.add(len(geom.verts) - len(me.vertices))
+	me.edges.add(len(geom.edges) - len(me.edges))
+	me.loops.add(len(geom.loops) - len(me.loops))
+	me.polygons.add(len(geom.loop_start) - len(me.polygons))
+
+def write_coordinates(me, geom):
+	me.vertices.foreach_set('co', geom.verts.ravel())
+
+def write_topology(me, geom):
+	# bulk assign the arrays generated by the kernel with foreach_set,
+	# this is a single memcpy-like call per attribute instead of a call per element
+	me.edges.foreach_set('vertices', geom.edges.ravel())
+	me.edges.foreach_set('crease', geom.creases)
+	me.loops.foreach_set('vertex_index', geom.loops)
+	me.loops.foreach_set('edge_index', geom.loop_edges)
+	me.polygons.foreach_set('loop_start', geom.loop_start)
+	me.polygons.foreach_set('loop_total', geom.loop_total)
+	# make all faces appear smooth
+	me.polygons.foreach_set('use_smooth', np.ones(len(geom.loop_start), dtype=bool))
+	# keep the creases when switching to edit mode
+	me.use_customdata_edge_crease = True
+
+def write_geometry(me, geom):
+	clear_mesh(me)
+	grow_mesh(me, geom)
+	write_topology(me, geom)
+	write_coordinates(me, geom)
+
+def mesh_counts(me):
+	return (len(me.vertices), len(me.edges), len(me.loops), len(me.polygons))
+
+def geometry_counts(geom):
+	return (len(geom.verts), len(geom.edges), len(geom.loops), len(geom.loop_start))
+
+def ladder_params(ob):
+	return (ob.ladder.height, ob.ladder.width, ob.ladder.rungs, ob.ladder.taper)
+
+def addon_preferences():
+	addon = bpy.context.user_preferences.addons.get(__name__)
+	return addon.preferences if addon is not None else None
+
+applied_preferences = {'profile': None}
+
+def apply_preferences():
+	# the preferences are read here because they are not available yet when
+	# the add-on is registered
+	prefs = addon_preferences()
+	if prefs is None:
+		return
+	kernel.cache.resize(prefs.cache_size * 2**20)
+	path = bpy.path.abspath(prefs.profile) if prefs.profile else ''
+	if path != applied_preferences['profile']:
+		applied_preferences['profile'] = path
+		try:
+			kernel.use_profile(path)
+		except (OSError, ValueError, KeyError) as e:
+			print("Ladder: cannot load profile %s (%s), using the default profile" % (path, e))
+			kernel.use_profile()
+		shared_index['valid'] = False
+
+def ladder_geometry(params):
+	# identical parameter sets are common (e.g. on every frame of an animation
+	# where the ladder does not change) so we go through the geometry cache
+	return kernel.cached_geometry(*params)
+
+def store_params(me, params):
+	# called after the geometry is written, the element counts are stored
+	# too so we can tell later whether the mesh was edited in the mean time
+	me['ladder'] = params
+	me['ladder_profile'] = kernel.active_profile().digest
+	me['ladder_counts'] = mesh_counts(me)
+
+def built_params(me):
+	# the parameters the mesh was last built with are stored on the mesh itself,
+	# that way they stay in sync with its contents on undo and when saved.
+	# returns None if the mesh was not built by us with the active profile
+	# or was changed afterwards
+	if 'ladder' not in me or me.get('ladder_profile') != kernel.active_profile().digest:
+		return None
+	if 'ladder_counts' not in me or tuple(me['ladder_counts']) != mesh_counts(me):
+		return None
+	return tuple(me['ladder'])
+
+def built_key(me):
+	old = built_params(me)
+	return kernel.cache_key(*old) if old is not None else None
+
+def updateLadderMesh(me, params, geom=None):
+
+	old = built_params(me)
+	intact = old is not None
+	rungs = params[2]
+	old_rungs = int(old[2]) if intact else 0
+
+	# nothing changed since the last time, so there is nothing to write either
+	if intact and kernel.cache_key(*old) == kernel.cache_key(*params):
+		return False
+
+	# add some geometry. we refer to different prop locations now!
+	# no need to remove doubles: the kernel shares the vertices where
+	# consecutive segments touch so the geometry is already welded
+	if geom is None:
+		geom = ladder_geometry(params)
+
+	# if the mesh still holds what we built last time we only have to
+	# change what differs instead of rebuilding everything from scratch.
+	# that relies on the elements of a ladder being a prefix of those of a
+	# ladder with more rungs, which does not hold for profiles that need
+	# kernel.weld() (counts() returns None for those)
+	prefix = kernel.counts(rungs) is not None
+	if not intact:
+		write_geometry(me, geom)
+	elif rungs == old_rungs and prefix:
+		# only the width, height or taper changed: same topology, new coordinates
+		write_coordinates(me, geom)
+	elif rungs == old_rungs and geometry_counts(geom) == mesh_counts(me):
+		# the same for a welded profile, but the order of the elements may differ
+		write_topology(me, geom)
+		write_coordinates(me, geom)
+	elif rungs > old_rungs and prefix:
+		# more rungs: the existing elements are a prefix of the new ones so we
+		# append the new segments and rewrite the arrays in place
+		grow_mesh(me, geom)
+		write_topology(me, geom)
+		write_coordinates(me, geom)
+	else:
+		# fewer rungs: there is no way to remove elements through the Mesh api
+		# so we truncate by rebuilding
+		write_geometry(me, geom)
+	store_params(me, params)
+	me.update()
+	return True
+
+def mesh_materials(me):
+	# material slots are linked to the mesh by default, so two ladders can only
+	# share a mesh if they want the same materials in the same slots
+	return tuple(ma.name if ma is not None else '' for ma in me.materials)
+
+def share_key(me):
+	key = built_key(me)
+	return (key, mesh_materials(me)) if key is not None else None
+
+# ladders with identical parameters and materials share a single mesh. this
+# maps the cache key of each parameter set plus the material names to the name
+# of the mesh that holds its geometry. the index is rebuilt from the stored
+# parameters of the meshes when it is first needed after a load or an undo
+shared_index = {'valid': False, 'meshes': {}}
+
+def shared_meshes():
+	if not shared_index['valid']:
+		shared_index['meshes'] = {}
+		for me in bpy.data.meshes:
+			key = share_key(me)
+			if key is not None:
+				shared_index['meshes'][key] = me.name
+		shared_index['valid'] = True
+	return shared_index['meshes']
+
+def find_shared_mesh(key, materials):
+	meshes = shared_meshes()
+	key = (key, materials)
+	name = meshes.get(key)
+	if name is None:
+		return None
+	me = bpy.data.meshes.get(name)
+	if me is None or share_key(me) != key:
+		# renamed, removed or changed behind our back
+		del meshes[key]
+		return None
+	return me
+
+def share_mesh(me):
+	meshes = shared_meshes()
+	for key, name in list(meshes.items()):
+		if name == me.name:
+			del meshes[key]
+	key = share_key(me)
+	if key is not None:
+		meshes[key] = me.name
+
+def release_mesh(me):
+	# remove a ladder mesh that is no longer used by any object
+	if me.users == 0:
+		meshes = shared_meshes()
+		key = share_key(me)
+		if meshes.get(key) == me.name:
+			del meshes[key]
+		bpy.data.meshes.remove(me)
+
+def updateLadderObjectMesh(ob, geom=None):
+	# point the object at a mesh with the geometry for its current properties,
+	# sharing it with other ladders where possible. returns True if the object
+	# ended up with different geometry
+	params = ladder_params(ob)
+	key = kernel.cache_key(*params)
+	me = ob.data
+	if built_key(me) == key:
+		return False
+
+	shared = find_shared_mesh(key, mesh_materials(me))
+	if shared is not None:
+		# another ladder already has exactly this geometry and the same
+		# materials, so we just use its mesh
+		ob.data = shared
+		release_mesh(me)
+		return True
+
+	if me.users > 1:
+		# copy on write: the mesh is still used by other ladders so we update a copy
+		# (copying keeps the stored parameters, so the update can be incremental)
+		me = me.copy()
+		ob.data = me
+	updateLadderMesh(me, params, geom)
+	share_mesh(me)
+	return True
+
+def updateLadderObject(ob, geom=None):
+	# returns True if the mesh had to be changed. geom may be passed in
+	# if the geometry for the current properties was generated already
+
+	apply_preferences()
+	changed = updateLadderObjectMesh(ob, geom)
+
+	# mark object as smooth (example of using ops on active object)
+	#bpy.ops.object.shade_smooth()
+	
+	
+	# add mirror modifier and subsurface modifier if needed
+	mods = ob.modifiers
+	if 'Mirror' not in mods:
+		m = mods.new('Mirror','MIRROR')
+		m.use_x = True
+		m.use_y = False
+		m.use_z = False
+	if 'Subsurf' not in mods:
+		m = mods.new('Subsurf','SUBSURF')
+		m.levels = 2
+		m.render_levels = 2
+
+	return changed
+
+def updateLadder(self, context):
+	# this function is called from the operator or it is called if the redraw value changes in the panel
+	# when called from the panel, self is the active object, otherwise self is the operator but to prevent confusion 
+	# we explicitely retrieve the active object 
+
+	ob = context.active_object
+	prefs = addon_preferences()
+	if bpy.app.background or (prefs is not None and not prefs.background):
+		updateLadderObject(ob)
+	else:
+		requestLadderUpdate(ob)
+
+# generating the geometry of a big ladder takes long enough to make dragging a
+# slider stutter, so when a property is changed interactively the arrays are
+# generated by a pool of worker threads (numpy releases the GIL for the heavy
+# lifting). only writing the result to the mesh has to happen on the main
+# thread, which is done from a scene_update_post handler once a job is done.
+# pending maps an object name to the (params, future) of its latest request,
+# a request that is superseded before it is committed is simply dropped
+pool = None
+pending = {}
+
+def worker_pool():
+	global pool
+	if pool is None:
+		pool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+	return pool
+
+def requestLadderUpdate(ob):
+	apply_preferences()
+	params = ladder_params(ob)
+	key = kernel.cache_key(*params)
+
+	previous = pending.pop(ob.name, None)
+	if previous is not None:
+		previous[1].cancel()
+
+	# if there is nothing to generate we can just as well do it right now
+	if built_key(ob.data) == key or key in kernel.cache or find_shared_mesh(key, mesh_materials(ob.data)) is not None:
+		updateLadderObject(ob)
+		return
+
+	pending[ob.name] = (params, worker_pool().submit(kernel.cached_geometry, *params))
+
+@persistent
+def commit_ladders(scene):
+	if not pending:
+		return
+	for name, (params, future) in list(pending.items()):
+		if not future.done():
+			continue
+		del pending[name]
+		ob = bpy.data.objects.get(name)
+		# the object may be gone or may have been changed since without going
+		# through the update callback (e.g. by an undo)
+		if ob is None or future.cancelled() or ladder_params(ob) != params:
+			continue
+		updateLadderObject(ob, future.result())
+
+def generate_parallel(keys, processes=0):
+	# generate the geometry for a list of cache keys, using all cores if we can.
+	# worker processes are forked so they inherit the loaded kernel module. that
+	# is only safe in a headless Blender on Linux: an interactive session runs
+	# the worker threads of the panel updates and Blender's own threads, and on
+	# macOS forking after Cocoa has started is unsafe. everywhere else we fall
+	# back to threads
+	if processes <= 0:
+		processes = os.cpu_count() or 1
+	processes = min(processes, len(keys))
+	if processes <= 1:
+		return [kernel.key_geometry(key) for key in keys]
+	if bpy.app.background and sys.platform.startswith('linux'):
+		with multiprocessing.get_context('fork').Pool(processes) as workers:
+			return workers.map(kernel.key_geometry, keys, chunksize=1)
+	with ThreadPoolExecutor(max_workers=processes) as workers:
+		return list(workers.map(kernel.key_geometry, keys))
+
+def regenerate_ladders(objects, force=False, processes=0):
+	"""
+	Rebuild the meshes of all ladder objects in objects.
+
+	Each distinct parameter set is generated once, in parallel, and written once.
+	With force the meshes are rebuilt even if their stored parameters say they
+	are up to date. Changing the stile profile does not need force, meshes
+	built with another profile are never considered up to date.
+	Returns the number of ladders and the number of distinct parameter sets.
+	"""
+	apply_preferences()
+	ladders = [ob for ob in objects if ob.type == 'MESH' and ob.ladder.ladder]
+	# ladders are grouped by parameters and materials, only ladders in the same
+	# group can end up sharing a mesh
+	groups = {}
+	for ob in ladders:
+		params = ladder_params(ob)
+		key = (kernel.cache_key(*params), mesh_materials(ob.data))
+		groups.setdefault(key, (params, []))[1].append(ob)
+
+	# the geometry is kept in a plain dict while it is written: the cache is
+	# bounded and may evict (or refuse) entries, which would then be generated
+	# again one at a time. the geometry for a key is deterministic so whatever
+	# is cached already can be reused, even with force
+	geometries = {}
+	for key, materials in groups:
+		if key not in geometries:
+			geometries[key] = kernel.cache.get(key)
+	keys = [key for key, geom in geometries.items() if geom is None]
+	for key, geom in zip(keys, generate_parallel(keys, processes)):
+		kernel.cache.put(key, geom)
+		geometries[key] = geom
+
+	for (key, materials), (params, obs) in groups.items():
+		geom = geometries[key]
+		if force:
+			# write a fresh copy of the first mesh (all meshes in the group have
+			# the same materials) and point every ladder in the group at it
+			me = obs[0].data.copy()
+			write_geometry(me, geom)
+			store_params(me, params)
+			me.update()
+			for ob in obs:
+				old = ob.data
+				ob.data = me
+				release_mesh(old)
+			share_mesh(me)
+		for ob in obs:
+			updateLadderObject(ob, geom)
+	return len(ladders), len(geometries)
+
+class LadderPropertyGroup(bpy.types.PropertyGroup):
+	ladder= BoolProperty(	name="Ladder", default=False)
+
+	taper = FloatProperty(	name="Taper",
+							description="Perc. tapering towards top",
+							default=0, min=0, max=100,
+							subtype='PERCENTAGE',
+							update=updateLadder)
+	width = FloatProperty(	name="Width",
+							description="Width of the ladder",
+							default=0.5, min=0.3, soft_max=.6,
+							unit='LENGTH',
+							update=updateLadder)
+	height= FloatProperty(	name="Height",
+							description="Step height",
+							default=0.3, min=0.1, soft_max=.5,
+							unit='LENGTH',
+							update=updateLadder)
+	rungs = IntProperty(	name="# Rungs",
+							description="Number of rungs",
+							default=12, min=1, soft_max=30,
+							update=updateLadder)
+
+class LadderPreferences(bpy.types.AddonPreferences):
+	bl_idname = __name__
+
+	cache_size = IntProperty(	name="Geometry cache (MB)",
+								description="Memory available to cache generated ladder geometry",
+								default=64, min=0, soft_max=1024)
+	profile = StringProperty(	name="Stile profile",
+								description="Profile (.npz) with the cross section of stile and rung, empty for the default",
+								subtype='FILE_PATH')
+	background = BoolProperty(	name="Generate in background",
+								description="Generate geometry in worker threads when a property is changed in the panel",
+								default=True)
+
+	def draw(self, context):
+		layout = self.layout
+		layout.prop(self, 'cache_size')
+		layout.prop(self, 'profile')
+		layout.prop(self, 'background')
+		cache = kernel.cache
+		layout.label("%d entries, %.1f MB, %d hits, %d misses" % (
+			len(cache.entries), cache.size / 2**20, cache.hits, cache.misses))
+
+class LadderPropsPanel(bpy.types.Panel):
+	bl_label = "Ladder"
+	bl_space_type = "VIEW_3D"
+	bl_region_type = "TOOLS"
+	bl_category = "Ladder"
+	bl_options = set()
+	
+	@classmethod
+	def poll(self, context):
+		# Check if we are in object mode (and we are dealing with a ladder object)
+		return (	context.mode == 'OBJECT'
+				and	(context.active_object is not None)
+				and	(context.active_object.ladder is not None)
+				and	context.active_object.ladder.ladder	)
+
+	def draw(self, context):
+		layout = self.layout
+		ob = context.active_object.ladder
+		layout.prop(ob, 'width')
+		layout.prop(ob, 'height')
+		layout.prop(ob, 'rungs')
+		layout.prop(ob, 'taper')
+		layout.operator(RegenerateLadders.bl_idname)
+
+
+class Ladder(bpy.types.Operator):
+	"""Add a ladder mesh object to the scene"""
+	bl_idname = "mesh.ladder05"
+	bl_label = "Ladder"
+	bl_options = {'REGISTER', 'UNDO', 'PRESET'}
+
+	@classmethod
+	def poll(cls, context):
+		return context.mode == 'OBJECT'
+
+	def execute(self, context):
+		# create a new empty mesh (it is replaced by a shared one
+		# if a ladder with the same properties already exists)
+		me = bpy.data.meshes.new(name='Ladder')
+
+		# create a new object and identify it as a ladder object
+		ob = bpy.data.objects.new('Ladder', me)
+		ob.ladder.ladder = True
+
+		# associate the mesh with the object
+		ob.data = me
+
+		# link the object to the scene & make it active and selected
+		context.scene.objects.link(ob)
+		context.scene.update()
+		context.scene.objects.active = ob
+		ob.select = True
+
+		# create the geometry based on properties in the Ladder panel.
+		# we do not go through updateLadder() because the geometry has to
+		# be there before the undo step of this operator is pushed
+		updateLadderObject(ob)
+
+		return {'FINISHED'}
+
+# the names of the ladder objects whose properties are animated or driven.
+# looking for animation data means walking every object in the scene so
+# we only do that when the key of the index changes, when objects or actions
+# are edited (assigning an action, adding a driver or an nla strip), when an
+# indexed object was renamed or removed, or after a load or an undo, which
+# may swap in completely different data
+animated_index = {'key': None, 'names': [], 'frame': None}
+
+def is_ladder_path(data_path):
+	return data_path.startswith('ladder.')
+
+def is_animated_ladder(ob):
+	ad = ob.animation_data
+	if ad is None or not ob.ladder.ladder:
+		return False
+	actions = [ad.action] + [strip.action for track in ad.nla_tracks for strip in track.strips]
+	for action in actions:
+		if action is not None and any(is_ladder_path(fc.data_path) for fc in action.fcurves):
+			return True
+	return any(is_ladder_path(fc.data_path) for fc in ad.drivers)
+
+def animated_ladders(scene):
+	key = (	scene.name,
+			len(scene.objects),
+			len(bpy.data.actions),
+			sum(len(action.fcurves) for action in bpy.data.actions))
+	if animated_index['key'] == key:
+		obs = [bpy.data.objects.get(name) for name in animated_index['names']]
+		if all(ob is not None and ob.ladder.ladder for ob in obs):
+			return obs
+	animated_index['key'] = key
+	obs = [ob for ob in scene.objects if is_animated_ladder(ob)]
+	animated_index['names'] = [ob.name for ob in obs]
+	return obs
+
+@persistent
+def invalidate_indices(dummy):
+	animated_index['key'] = None
+	shared_index['valid'] = False
+
+@persistent
+def repair_ladders(dummy):
+	# a mesh written by commit_ladders() lands after the undo step of the
+	# property change was pushed, so undoing or redoing onto that step restores
+	# the new properties with the old mesh. any ladder whose mesh was not built
+	# for its current properties is regenerated here
+	invalidate_indices(dummy)
+	for ob in bpy.data.objects:
+		if ob.type == 'MESH' and ob.ladder.ladder:
+			if built_key(ob.data) != kernel.cache_key(*ladder_params(ob)):
+				updateLadderObject(ob)
+
+@persistent
+def watch_animation(scene):
+	# objects and actions are flagged as updated when they are edited, but
+	# also when animation is evaluated for a new frame. the latter does not
+	# change what is animated, so it should not cost a rebuild of the index
+	# on every frame during playback
+	if animated_index['frame'] != scene.frame_current:
+		animated_index['frame'] = scene.frame_current
+		return
+	if bpy.data.objects.is_updated or bpy.data.actions.is_updated:
+		animated_index['key'] = None
+
+class RegenerateLadders(bpy.types.Operator):
+	"""Regenerate the meshes of all ladder objects in the file"""
+	bl_idname = "object.ladder05_regenerate"
+	bl_label = "Regenerate all ladders"
+	bl_options = {'REGISTER', 'UNDO'}
+
+	force = BoolProperty(	name="Force",
+							description="Rebuild meshes even if they are up to date",
+							default=False)
+	processes = IntProperty(name="Processes",
+							description="Number of parallel workers (0 = one per core)",
+							default=0, min=0)
+
+	@classmethod
+	def poll(cls, context):
+		return context.mode == 'OBJECT'
+
+	def execute(self, context):
+		nladders, nunique = regenerate_ladders(bpy.data.objects, self.force, self.processes)
+		context.scene.update()
+		self.report({'INFO'}, "Regenerated %d ladders (%d distinct)" % (nladders, nunique))
+		return {'FINISHED'}
+
+@persistent
+def update_ladders(scene):
+	# only the animated ladders can have changed by changing the frame and
+	# of those we only rebuild the ones whose properties actually differ
+	# from the ones their mesh was built with
+	changed = False
+	for ob in animated_ladders(scene):
+		changed |= updateLadderObject(ob)
+	if changed:
+		scene.update()
+
+def register():
+	bpy.utils.register_module(__name__)
+	# adding a pointer to a propertygroup will cause *every* object in the scene to have a pointer to a possibly empty propertygroup
+	# only when assigning to a member of this property group will this propertygroup itself be instantiated
+	bpy.types.Object.ladder = bpy.props.PointerProperty(type=LadderPropertyGroup)
+	bpy.types.INFO_MT_mesh_add.append(menu_func)
+	# add a post frame change handler to update all ladder objects.
+	# w.o. it object properties can be animated but will not result in actual changes to the object.
+	# (this is a known issue https://developer.blender.org/T48285 )
+	bpy.app.handlers.frame_change_post.append(update_ladders)
+	bpy.app.handlers.load_post.append(invalidate_indices)
+	bpy.app.handlers.undo_post.append(repair_ladders)
+	bpy.app.handlers.redo_post.append(repair_ladders)
+	bpy.app.handlers.scene_update_post.append(commit_ladders)
+	bpy.app.handlers.scene_update_post.append(watch_animation)
+
+def unregister():
+	bpy.utils.unregister_module(__name__)
+	bpy.types.INFO_MT_mesh_add.remove(menu_func)
+	bpy.app.handlers.frame_change_post.remove(update_ladders)
+	bpy.app.handlers.load_post.remove(invalidate_indices)
+	bpy.app.handlers.undo_post.remove(repair_ladders)
+	bpy.app.handlers.redo_post.remove(repair_ladders)
+	bpy.app.handlers.scene_update_post.remove(commit_ladders)
+	bpy.app.handlers.scene_update_post.remove(watch_animation)
+	global pool
+	if pool is not None:
+		pool.shutdown(wait=False)
+		pool = None
+	pending.clear()
+	bpy.utils.unregister_module(__name__)
+	
+def menu_func(self, context):
+	self.layout.operator(Ladder.bl_idname, icon='PLUGIN')
@@ -0,0 +1,63 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  Ladder, a Blender addon
+#  (c) 2016 Michel J. Anders (varkenvarken)
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# regenerate all ladders in a .blend file without starting the user interface:
+#
+#   blender -b site.blend --python ladder_05/batch.py -- [--force] [--processes N] [--save]
+#
+# everything after the -- is passed to this script, blender ignores it
+
+import argparse
+import os
+import sys
+
+import bpy
+
+def parse_args(argv):
+	argv = argv[argv.index('--') + 1:] if '--' in argv else []
+	parser = argparse.ArgumentParser(prog='blender -b file.blend --python batch.py --',
+		description='Regenerate all ladder objects in a .blend file')
+	parser.add_argument('--force', action='store_true',
+		help='rebuild meshes even if they are up to date')
+	parser.add_argument('--processes', type=int, default=0,
+		help='number of worker processes (default: one per core)')
+	parser.add_argument('--save', action='store_true',
+		help='save the file after regenerating')
+	return parser.parse_args(argv)
+
+def main(argv):
+	args = parse_args(argv)
+
+	# the add-on may not be installed or enabled when running headless, in
+	# which case we import it from the directory this script lives in
+	sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+	import ladder_05
+	if not hasattr(bpy.types.Object, 'ladder'):
+		ladder_05.register()
+
+	nladders, nunique = ladder_05.regenerate_ladders(bpy.data.objects, args.force, args.processes)
+	print("regenerated %d ladders (%d distinct)" % (nladders, nunique))
+
+	if args.save:
+		bpy.ops.wm.save_mainfile()
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,601 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  Ladder, a Blender addon
+#  (c) 2016 Michel J. Anders (varkenvarken)
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# the pure array part of the ladder generator. this module only depends on numpy
+# (no bpy, bmesh or mathutils) so it can be imported and tested outside Blender,
+# for example by putting the ladder_05 directory on sys.path and importing kernel
+
+import hashlib
+import os
+from collections import namedtuple, OrderedDict
+from threading import Lock
+
+import numpy as np
+
+# a profile describes the cross section of the stile and the rung that is
+# bridged to it. profiles are stored as .npz files of compact typed arrays:
+# float32 coordinates, int32 indices and two bitmasks with a bit per stile edge.
+# creased edges form the hole in the stile that is bridged to the rung (they
+# get a crease of 1.0), the vertices of selected edges are the top and bottom
+# rings of the stile that stretch with the step height. faces are stored as a
+# flat array of vertex indices plus the number of vertices of each face
+PROFILE_FORMAT = 1
+PROFILE_ARRAYS = (	'stile_verts', 'stile_edges', 'stile_loops', 'stile_loop_total',
+					'crease', 'select', 'rung_verts', 'rung_edges')
+PROFILE_DTYPES = (	np.float32, np.int32, np.int32, np.int32,
+					np.uint8, np.uint8, np.float32, np.int32)
+DEFAULT_PROFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles', 'default.npz')
+
+Profile = namedtuple('Profile', ('name', 'digest') + PROFILE_ARRAYS)
+
+# loaded profiles by (path, modification time) and by digest. loading is lazy and
+# a file is only read again if it changed. cache keys refer to the profile by
+# digest, which is also how worker processes (that inherit these) find it back
+_profiles = {}
+_profiles_by_digest = {}
+_active_profile = None
+
+def _profile(name, arrays):
+	arrays = {field: np.ascontiguousarray(arrays[field], dtype=dtype)
+				for field, dtype in zip(PROFILE_ARRAYS, PROFILE_DTYPES)}
+	arrays['stile_verts'] = arrays['stile_verts'].reshape(-1, 3)
+	arrays['stile_edges'] = arrays['stile_edges'].reshape(-1, 2)
+	arrays['rung_verts'] = arrays['rung_verts'].reshape(-1, 3)
+	arrays['rung_edges'] = arrays['rung_edges'].reshape(-1, 2)
+	_check_profile(name, arrays)
+	digest = hashlib.sha1()
+	for field in PROFILE_ARRAYS:
+		digest.update(arrays[field].tobytes())
+	profile = Profile(name=name, digest=digest.hexdigest()[:16], **arrays)
+	_profiles_by_digest[profile.digest] = profile
+	return profile
+
+def _is_closed_loop(edges):
+	# True if the edges form a single closed loop of at least three vertices
+	if len(edges) < 3:
+		return False
+	degree = np.bincount(edges.ravel())
+	if (degree[degree > 0] != 2).any():
+		return False
+	return len(set(_cycle(edges.tolist()))) == len(edges)
+
+def _check_profile(name, arrays):
+	# segment() bridges the creased loop of the stile to the rung loop vertex by
+	# vertex, anything else would crash it or silently produce a broken mesh
+	nstile = len(arrays['stile_verts'])
+	nedges = len(arrays['stile_edges'])
+	def check(condition, message):
+		if not condition:
+			raise ValueError("ladder profile %s: %s" % (name, message))
+	check(((arrays['stile_edges'] >= 0) & (arrays['stile_edges'] < nstile)).all(), "stile edge index out of range")
+	check(((arrays['stile_loops'] >= 0) & (arrays['stile_loops'] < nstile)).all(), "stile face index out of range")
+	check(((arrays['rung_edges'] >= 0) & (arrays['rung_edges'] < len(arrays['rung_verts']))).all(), "rung edge index out of range")
+	check((arrays['stile_loop_total'] >= 3).all() and arrays['stile_loop_total'].sum() == len(arrays['stile_loops']),
+		"face sizes do not match the face vertices")
+	check(len(arrays['crease']) * 8 >= nedges and len(arrays['select']) * 8 >= nedges, "edge masks are too short")
+	creased = np.unpackbits(arrays['crease'])[:nedges].astype(bool)
+	check(_is_closed_loop(arrays['stile_edges'][creased]), "the creased edges do not form one closed loop")
+	check(_is_closed_loop(arrays['rung_edges']), "the rung edges do not form one closed loop")
+	check(creased.sum() == len(arrays['rung_edges']), "the creased loop and the rung loop differ in length")
+
+def make_profile(name, stile_verts, stile_edges, stile_faces, creased, selected, rung_verts, rung_edges):
+	"""
+	Return a Profile built from plain sequences, e.g. exported from a mesh.
+
+	creased and selected hold a boolean per stile edge.
+	"""
+	return _profile(name, {
+		'stile_verts'     : stile_verts,
+		'stile_edges'     : stile_edges,
+		'stile_loops'     : [v for f in stile_faces for v in f],
+		'stile_loop_total': [len(f) for f in stile_faces],
+		'crease'          : np.packbits(np.array(creased, dtype=bool)),
+		'select'          : np.packbits(np.array(selected, dtype=bool)),
+		'rung_verts'      : rung_verts,
+		'rung_edges'      : rung_edges,
+	})
+
+def save_profile(path, profile):
+	np.savez(path, format=np.array(PROFILE_FORMAT), **{field: getattr(profile, field) for field in PROFILE_ARRAYS})
+
+def load_profile(path=None):
+	"""
+	Return the Profile stored in path, or the default profile if path is empty.
+	"""
+	path = os.path.abspath(path or DEFAULT_PROFILE)
+	key = (path, os.path.getmtime(path))
+	profile = _profiles.get(key)
+	if profile is None:
+		with np.load(path) as data:
+			if int(data['format']) != PROFILE_FORMAT:
+				raise ValueError("%s: unsupported ladder profile format %d" % (path, int(data['format'])))
+			arrays = {field: data[field] for field in PROFILE_ARRAYS}
+		profile = _profile(os.path.splitext(os.path.basename(path))[0], arrays)
+		_profiles[key] = profile
+	return profile
+
+def use_profile(path=None):
+	"""
+	Make the profile stored in path (or the default profile) the active one.
+	"""
+	global _active_profile
+	_active_profile = load_profile(path)
+	return _active_profile
+
+def active_profile():
+	if _active_profile is None:
+		use_profile()
+	return _active_profile
+
+# the generated mesh in the same layout Blender uses for its Mesh datablock.
+# faces are stored as a flat array of loops (vertex indices) plus a start
+# index and a count per polygon, loop_edges holds the edge index of each loop
+Geometry = namedtuple('Geometry', 'verts edges creases loops loop_edges loop_start loop_total')
+
+def _cycle(edges):
+	# order a closed loop of (v0, v1) edges into a list of vertex indices
+	neighbours = {}
+	for a, b in edges:
+		neighbours.setdefault(a, []).append(b)
+		neighbours.setdefault(b, []).append(a)
+	start = edges[0][0]
+	cycle = [start, neighbours[start][0]]
+	while len(cycle) < len(edges):
+		a, b = neighbours[cycle[-1]]
+		cycle.append(b if a == cycle[-2] else a)
+	return cycle
+
+def _bridge(verts, faces, loop_a, loop_b):
+	# the equivalent of bmesh.ops.bridge_loops for two closed loops with the same
+	# number of vertices: pick the rotation and direction of loop_b that lies
+	# closest to loop_a and wind the new faces opposite to the existing faces
+	# that share an edge with loop_a so the normals stay consistent
+	a = _cycle(loop_a)
+	b = _cycle(loop_b)
+	n = len(a)
+	best = None
+	for candidate in (b, b[::-1]):
+		for shift in range(n):
+			c = candidate[shift:] + candidate[:shift]
+			d = sum(sum((verts[i][k] - verts[j][k])**2 for k in range(3)) for i, j in zip(a, c))
+			if best is None or d < best[0]:
+				best = (d, c)
+	b = best[1]
+
+	directed = set()
+	for f in faces:
+		directed.update(zip(f, f[1:] + f[:1]))
+	flip = (a[0], a[1]) in directed
+
+	bridge_faces = []
+	for i in range(n):
+		j = (i + 1) % n
+		if flip:
+			bridge_faces.append((a[j], a[i], b[i], b[j]))
+		else:
+			bridge_faces.append((a[i], a[j], b[j], b[i]))
+	bridge_edges = [(a[i], b[i]) for i in range(n)]
+	return bridge_edges, bridge_faces
+
+_segments = {}
+
+def segment(profile=None):
+	"""
+	Return the topology of a single stile plus rung segment.
+
+	The result is computed once per profile and reused, it does not depend on
+	the ladder properties. It is a dict with the untransformed vertex
+	coordinates, boolean masks for the vertices that belong to the stile and
+	those that stretch with the unit height, and the edge, crease and face
+	arrays. profile defaults to the active profile.
+	"""
+	profile = profile or active_profile()
+	if profile.digest in _segments:
+		return _segments[profile.digest]
+
+	nstile = len(profile.stile_verts)
+	nedges = len(profile.stile_edges)
+	creased = np.unpackbits(profile.crease)[:nedges].astype(bool)
+	selected = np.unpackbits(profile.select)[:nedges].astype(bool)
+	starts = np.cumsum(profile.stile_loop_total)[:-1]
+	stile_faces = [tuple(f.tolist()) for f in np.split(profile.stile_loops, starts)]
+
+	verts = [tuple(v) for v in profile.stile_verts.astype(np.float64).tolist()]
+	verts += [tuple(v) for v in profile.rung_verts.astype(np.float64).tolist()]
+	edges = [tuple(e) for e in profile.stile_edges.tolist()]
+	edges += [(a + nstile, b + nstile) for a, b in profile.rung_edges.tolist()]
+	creases = creased.astype(np.float32).tolist() + [0.0] * len(profile.rung_edges)
+
+	# the creased edges form the hole in the stile that is bridged to the rung
+	stile_loop = [edges[n] for n in np.flatnonzero(creased)]
+	rung_loop = edges[nedges:]
+	bridge_edges, bridge_faces = _bridge(verts, stile_faces, stile_loop, rung_loop)
+	edges += bridge_edges
+	creases += [0.0] * len(bridge_edges)
+	faces = stile_faces + bridge_faces
+
+	# the vertices of the selected edges are the top and bottom rings of the stile
+	stretch = np.zeros(len(verts), dtype=bool)
+	stretch[profile.stile_edges[selected].ravel()] = True
+	stile = np.zeros(len(verts), dtype=bool)
+	stile[:nstile] = True
+
+	edge_index = {}
+	for n, (a, b) in enumerate(edges):
+		edge_index[(a, b)] = n
+		edge_index[(b, a)] = n
+	loops = [v for f in faces for v in f]
+	loop_edges = [edge_index[e] for f in faces for e in zip(f, f[1:] + f[:1])]
+	loop_total = [len(f) for f in faces]
+
+	_segments[profile.digest] = {
+		'verts'     : np.array(verts, dtype=np.float64),
+		'stile'     : stile,
+		'stretch'   : stretch,
+		'edges'     : np.array(edges, dtype=np.int32),
+		'creases'   : np.array(creases, dtype=np.float32),
+		'loops'     : np.array(loops, dtype=np.int32),
+		'loop_edges': np.array(loop_edges, dtype=np.int32),
+		'loop_total': np.array(loop_total, dtype=np.int32),
+		'seam'      : _seam(verts, edges, stile, stretch, edge_index),
+	}
+	return _segments[profile.digest]
+
+def _seam(verts, edges, stile, stretch, edge_index):
+	# consecutive segments touch where the bottom ring of the stile of one segment
+	# coincides with the top ring of the segment below it. if we know which
+	# vertices and edges of the two rings correspond we can share them when
+	# tiling instead of welding afterwards. returns None if the profile does not
+	# have two matching rings, in which case geometry() falls back to weld()
+	co = np.array(verts)
+	z = co[:, 2]
+	zmin = z[stile].min()
+	zmax = z[stile].max()
+	bottom = np.flatnonzero(stile & np.isclose(z, zmin))
+	top = np.flatnonzero(stile & np.isclose(z, zmax))
+	if len(bottom) == 0 or len(bottom) != len(top):
+		return None
+	# the rings only line up after stretching if both of them are stretched
+	if not (stretch[bottom].all() and stretch[top].all()):
+		return None
+
+	match = {}
+	for b in bottom:
+		d = np.abs(co[top, :2] - co[b, :2]).max(axis=1)
+		t = np.argmin(d)
+		if d[t] > 1e-6:
+			return None
+		match[b] = top[t]
+
+	ring = set(bottom.tolist())
+	ring_edges = [n for n, (a, b) in enumerate(edges) if a in ring and b in ring]
+	top_edges = []
+	for n in ring_edges:
+		a, b = edges[n]
+		if (match[a], match[b]) not in edge_index:
+			return None
+		top_edges.append(edge_index[(match[a], match[b])])
+
+	return {
+		'bottom'    : bottom,
+		'top'       : np.array([match[b] for b in bottom], dtype=np.int64),
+		'ring_edges': np.array(ring_edges, dtype=np.int64),
+		'top_edges' : np.array(top_edges, dtype=np.int64),
+	}
+
+def _index_maps(n, shared, partner, repetitions):
+	# map the n elements of each repetition to their index in the welded arrays.
+	# the welded layout is: the shared elements of the first repetition followed
+	# by the remaining (body) elements of every repetition in turn. in repetition
+	# r > 0 a shared element is the body element 'partner' of repetition r - 1
+	body = np.setdiff1d(np.arange(n), shared)
+	k = len(shared)
+	m = len(body)
+	body_pos = np.full(n, -1, dtype=np.int64)
+	body_pos[body] = np.arange(m)
+
+	reps = np.arange(repetitions)[:, None]
+	index = np.empty((repetitions, n), dtype=np.int64)
+	index[:, body] = k + reps * m + np.arange(m)
+	index[0, shared] = np.arange(k)
+	index[1:, shared] = k + (reps[1:] - 1) * m + body_pos[partner]
+	return index, body
+
+def geometry(unit_height, unit_width, repetitions, taper, profile=None):
+	"""
+	Return the Geometry of a ladder with the given number of rungs.
+
+	All repetitions of the segment are generated in one go by tiling the segment
+	arrays. Consecutive segments share the vertices and edges of the rings where
+	they touch so no welding is needed afterwards. profile defaults to the
+	active profile.
+	"""
+	seg = segment(profile)
+	seam = seg['seam']
+	nverts = len(seg['verts'])
+	nedges = len(seg['edges'])
+	stile_verts = seg['verts'][seg['stile']]
+
+	maxx = stile_verts[:, 0].max()
+	offset = unit_width/2 - abs(maxx)
+	height = stile_verts[:, 2].max() - stile_verts[:, 2].min()
+	max_height = repetitions * unit_height
+	hscale = unit_height / height
+
+	# position the stile and stretch its top and bottom rings to the unit height
+	co = seg['verts'].copy()
+	co[seg['stile'], 0] -= offset
+	co[seg['stretch'], 2] *= hscale
+
+	if seam is None:
+		shared = np.zeros(0, dtype=np.int64)
+		vmap, vbody = _index_maps(nverts, shared, shared, repetitions)
+		emap, ebody = _index_maps(nedges, shared, shared, repetitions)
+	else:
+		vmap, vbody = _index_maps(nverts, seam['bottom'], seam['top'], repetitions)
+		emap, ebody = _index_maps(nedges, seam['ring_edges'], seam['top_edges'], repetitions)
+	vshared = np.setdiff1d(np.arange(nverts), vbody)
+	eshared = np.setdiff1d(np.arange(nedges), ebody)
+
+	# stack the repetitions on top of each other
+	reps = np.arange(repetitions)
+	body = np.empty((repetitions, len(vbody), 3), dtype=np.float64)
+	body[:] = co[vbody]
+	body[:, :, 2] += (unit_height * reps)[:, None]
+	verts = np.concatenate((co[vshared], body.reshape(-1, 3)))
+
+	# skew the vertices, but only those that belong to the stiles
+	skew = verts[:, 0] < -0.001
+	vtaper = (verts[skew, 2] / max_height) * (taper * 0.01)
+	verts[skew, 0] += vtaper * unit_width/2
+
+	seg_edges = seg['edges']
+	edges = np.concatenate((vmap[0][seg_edges[eshared]],
+							vmap[reps[:, None, None], seg_edges[ebody][None, :, :]].reshape(-1, 2)))
+	creases = np.concatenate((seg['creases'][eshared], np.tile(seg['creases'][ebody], repetitions)))
+	loops = vmap[reps[:, None], seg['loops'][None, :]].ravel()
+	loop_edges = emap[reps[:, None], seg['loop_edges'][None, :]].ravel()
+	loop_total = np.tile(seg['loop_total'], repetitions)
+	loop_start = np.zeros(len(loop_total), dtype=np.int32)
+	np.cumsum(loop_total[:-1], out=loop_start[1:])
+
+	geom = Geometry(verts.astype(np.float32),
+					edges.astype(np.int32),
+					creases,
+					loops.astype(np.int32),
+					loop_edges.astype(np.int32),
+					loop_start,
+					loop_total)
+	if seam is None:
+		geom = weld(geom, 0.001)
+	return geom
+
+def counts(repetitions, profile=None):
+	"""
+	Return the number of vertices, edges, loops and polygons of a ladder.
+
+	Because the segments are welded by index, the elements of a ladder with n
+	rungs are a prefix of those of a ladder with more rungs, so a mesh can be
+	grown by appending elements. Returns None if the profile needs weld() as the
+	element order then depends on the whole mesh.
+	"""
+	seg = segment(profile)
+	seam = seg['seam']
+	if seam is None:
+		return None
+	nverts = len(seg['verts'])
+	nedges = len(seg['edges'])
+	kverts = len(seam['bottom'])
+	kedges = len(seam['ring_edges'])
+	return (kverts + repetitions * (nverts - kverts),
+			kedges + repetitions * (nedges - kedges),
+			repetitions * len(seg['loops']),
+			repetitions * len(seg['loop_total']))
+
+def _neighbour_cells():
+	return np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)])
+
+def weld(geom, dist):
+	"""
+	Merge all vertices of geom that lie within dist of each other.
+
+	This is the generic counterpart of bmesh.ops.remove_doubles for meshes where
+	the shared vertices are not known in advance. Vertices are binned in a hash
+	grid with a cell size of dist so only vertices in neighbouring cells have to
+	be compared. Edges that collapse or become duplicates are removed, as are
+	faces that end up with fewer than three vertices.
+	"""
+	verts = geom.verts
+	n = len(verts)
+	if n == 0:
+		return geom
+
+	# bin the vertices and encode each cell as a single integer key
+	cells = np.floor(verts / dist).astype(np.int64)
+	cmin = cells.min(axis=0) - 1
+	dims = cells.max(axis=0) - cmin + 2
+	def key(c):
+		c = c - cmin
+		return (c[:, 0] * dims[1] + c[:, 1]) * dims[2] + c[:, 2]
+	order = np.argsort(key(cells), kind='mergesort')
+	sorted_keys = key(cells)[order]
+
+	# collect candidate pairs from the 27 neighbouring cells and keep the close ones
+	parent = np.arange(n)
+	for offset in _neighbour_cells():
+		k = key(cells + offset)
+		lo = np.searchsorted(sorted_keys, k, side='left')
+		hi = np.searchsorted(sorted_keys, k, side='right')
+		count = hi - lo
+		if not count.any():
+			continue
+		i = np.repeat(np.arange(n), count)
+		j = order[np.repeat(lo - np.cumsum(count) + count, count) + np.arange(count.sum())]
+		close = (i < j) & (((verts[i] - verts[j])**2).sum(axis=1) <= dist * dist)
+		i = i[close]
+		j = j[close]
+		# union the pairs, always pointing at the lowest index
+		while len(i):
+			ri = parent[i]
+			rj = parent[j]
+			lo_root = np.minimum(ri, rj)
+			np.minimum.at(parent, ri, lo_root)
+			np.minimum.at(parent, rj, lo_root)
+			while True:
+				jumped = parent[parent]
+				if (jumped == parent).all():
+					break
+				parent = jumped
+			keep = parent[i] != parent[j]
+			i = i[keep]
+			j = j[keep]
+
+	roots, vmap = np.unique(parent, return_inverse=True)
+	new_verts = verts[roots]
+
+	# remap the edges and drop the ones that collapsed or became duplicates
+	edges = np.sort(vmap[geom.edges], axis=1)
+	valid = edges[:, 0] != edges[:, 1]
+	codes, emap = np.unique(edges[valid, 0] * len(new_verts) + edges[valid, 1], return_inverse=True)
+	unique_edges = np.column_stack(divmod(codes, len(new_verts)))
+	creases = np.zeros(len(unique_edges), dtype=np.float32)
+	np.maximum.at(creases, emap, geom.creases[valid])
+	edge_map = np.full(len(edges), -1, dtype=np.int64)
+	edge_map[valid] = emap
+
+	# drop loops whose vertex equals the next vertex in the same face
+	loops = vmap[geom.loops]
+	face = np.repeat(np.arange(len(geom.loop_start)), geom.loop_total)
+	nxt = np.arange(len(loops)) + 1
+	last = geom.loop_start + geom.loop_total - 1
+	nxt[last] = geom.loop_start
+	keep = loops != loops[nxt]
+	total = np.bincount(face[keep], minlength=len(geom.loop_start))
+	keep &= (total >= 3)[face]
+	total = total[total >= 3]
+	loop_start = np.zeros(len(total), dtype=np.int32)
+	np.cumsum(total[:-1], out=loop_start[1:])
+
+	return Geometry(new_verts.astype(np.float32),
+					unique_edges.astype(np.int32),
+					creases,
+					loops[keep].astype(np.int32),
+					edge_map[geom.loop_edges[keep]].astype(np.int32),
+					loop_start,
+					total.astype(np.int32))
+
+# parameters are quantized before they are used as a cache key so that values
+# that differ only in float noise (for example after animation evaluation)
+# share an entry. the geometry is generated from the quantized values so a
+# cache hit returns exactly what a miss would have generated. the key starts
+# with the digest of the profile, which defaults to the active profile
+QUANTUM = 1e-6
+
+def cache_key(unit_height, unit_width, repetitions, taper, profile=None):
+	profile = profile or active_profile()
+	return (profile.digest,
+			int(round(unit_height / QUANTUM)),
+			int(round(unit_width / QUANTUM)),
+			int(repetitions),
+			int(round(taper / QUANTUM)))
+
+def nbytes(geom):
+	return sum(a.nbytes for a in geom)
+
+class GeometryCache:
+	"""
+	A least recently used cache of generated geometry.
+
+	Entries are keyed by cache_key() and the cache holds at most max_bytes of
+	array data, the least recently used entries are evicted first. The arrays
+	of cached entries are read-only because they are shared by every caller.
+	The cache may be used from several threads at once.
+	"""
+
+	def __init__(self, max_bytes):
+		self.max_bytes = max_bytes
+		self.entries = OrderedDict()
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self.lock = Lock()
+
+	def __contains__(self, key):
+		with self.lock:
+			return key in self.entries
+
+	def get(self, key):
+		with self.lock:
+			geom = self.entries.get(key)
+			if geom is None:
+				self.misses += 1
+				return None
+			self.hits += 1
+			self.entries.move_to_end(key)
+			return geom
+
+	def put(self, key, geom):
+		size = nbytes(geom)
+		with self.lock:
+			if key in self.entries:
+				self.size -= nbytes(self.entries.pop(key))
+			if size > self.max_bytes:
+				return
+			for a in geom:
+				a.flags.writeable = False
+			self.entries[key] = geom
+			self.size += size
+			self._evict()
+
+	def _evict(self):
+		while self.size > self.max_bytes and self.entries:
+			key, geom = self.entries.popitem(last=False)
+			self.size -= nbytes(geom)
+
+	def resize(self, max_bytes):
+		with self.lock:
+			self.max_bytes = max_bytes
+			self._evict()
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.size = 0
+
+cache = GeometryCache(64 * 2**20)
+
+def cached_geometry(unit_height, unit_width, repetitions, taper):
+	"""
+	Return the same Geometry as geometry() but look it up in the cache first.
+	"""
+	key = cache_key(unit_height, unit_width, repetitions, taper)
+	geom = cache.get(key)
+	if geom is None:
+		geom = key_geometry(key)
+		cache.put(key, geom)
+	return geom
+
+def key_geometry(key):
+	"""
+	Return the Geometry for the parameters encoded in a cache_key().
+	"""
+	return geometry(key[1] * QUANTUM, key[2] * QUANTUM, key[3], key[4] * QUANTUM,
+					_profiles_by_digest[key[0]])
@@ -0,0 +1,386 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  Ladder benchmark, companion script for the Ladder addons
+#  (c) 2016 Michel J. Anders (varkenvarken)
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# measure how the ladder generators scale with the number of rungs.
+#
+# inside Blender all generators are available and every stage is timed,
+# including writing the mesh and evaluating the mirror and subsurf modifiers:
+#
+#   blender -b --python ladder_benchmark.py -- --output bench.json
+#
+# outside Blender only the numpy kernel of ladder_05 can be measured:
+#
+#   python ladder_benchmark.py --output bench.json
+#
+# the results are written as json. pass --baseline with an earlier result
+# file to compare against it, the script then exits with status 1 if any
+# stage got slower than the tolerance allows or if any element count changed
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+	import bpy
+	import bmesh
+except ImportError:
+	bpy = None
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+def load_kernel():
+	# load ladder_05/kernel.py by path so we do not need bpy to import the package
+	if bpy is not None:
+		sys.path.insert(0, here)
+		import ladder_05
+		return ladder_05.kernel
+	spec = importlib.util.spec_from_file_location('ladder_kernel', os.path.join(here, 'ladder_05', 'kernel.py'))
+	kernel = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(kernel)
+	return kernel
+
+kernel = load_kernel()
+
+class Stages:
+	# collects the time spent in each named stage of a single run
+	def __init__(self):
+		self.times = OrderedDict()
+
+	@contextmanager
+	def __call__(self, name):
+		start = time.perf_counter()
+		yield
+		self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+# the generators. each takes the ladder parameters and a Stages object and
+# returns the number of vertices, edges and faces it produced
+
+def run_ladder_05(height, width, repetitions, taper, stage):
+	with stage('kernel'):
+		geom = kernel.geometry(height, width, repetitions, taper)
+	if bpy is not None:
+		import ladder_05
+		me = bpy.data.meshes.new('bench')
+		with stage('to_mesh'):
+			ladder_05.write_geometry(me, geom)
+			me.update()
+		evaluate_modifiers(me, 'X', stage)
+	return len(geom.verts), len(geom.edges), len(geom.loop_start)
+
+def stacked_segments(height, width, repetitions, taper):
+	# unwelded copies of a single segment stacked on top of each other and
+	# tapered like geometry() does, so consecutive segments have coincident
+	# but separate vertices where they touch
+	seg = kernel.geometry(height, width, 1, 0)
+	nverts = len(seg.verts)
+	nedges = len(seg.edges)
+	reps = np.arange(repetitions)
+	verts = np.tile(seg.verts, (repetitions, 1)).astype(np.float64)
+	verts[:, 2] += np.repeat(height * reps, nverts)
+	skew = verts[:, 0] < -0.001
+	verts[skew, 0] += (verts[skew, 2] / (repetitions * height)) * (taper * 0.01) * width/2
+	return kernel.Geometry(verts.astype(np.float32),
+		(seg.edges[None] + (nverts * reps)[:, None, None]).reshape(-1, 2).astype(np.int32),
+		np.tile(seg.creases, repetitions),
+		(seg.loops + (nverts * reps)[:, None]).ravel().astype(np.int32),
+		(seg.loop_edges + (nedges * reps)[:, None]).ravel().astype(np.int32),
+		(seg.loop_start + (len(seg.loops) * reps)[:, None]).ravel().astype(np.int32),
+		np.tile(seg.loop_total, repetitions))
+
+def run_hash_weld(height, width, repetitions, taper, stage):
+	# the generic weld that is used for profiles without matching seam rings.
+	# geometry() already shares the seam vertices of the default profile, so
+	# weld the stacked segments instead, like the original ladder did
+	geom = stacked_segments(height, width, repetitions, taper)
+	with stage('weld'):
+		geom = kernel.weld(geom, 0.001)
+	return len(geom.verts), len(geom.edges), len(geom.loop_start)
+
+def run_ladder_04(height, width, repetitions, taper, stage):
+	import ladder_04
+	with stage('construction'):
+		bm = ladder_04.geometry(ladder_04.verts, ladder_04.faces, height, width, repetitions, taper)
+	with stage('remove_doubles'):
+		bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.001)
+	return bmesh_to_mesh(bm, 'Y', stage)
+
+def run_legacy_05(height, width, repetitions, taper, stage):
+	# the bmesh based pipeline that ladder_05 used before the numpy kernel,
+	# rebuilt from the default profile so we can keep comparing against it
+	profile = kernel.load_profile()
+	nedges = len(profile.stile_edges)
+	verts_stile = profile.stile_verts.tolist()
+	edges_stile = profile.stile_edges.tolist()
+	faces_stile = [f.tolist() for f in np.split(profile.stile_loops, np.cumsum(profile.stile_loop_total)[:-1])]
+	crease_stile = np.unpackbits(profile.crease)[:nedges].astype(float).tolist()
+	selected_stile = np.unpackbits(profile.select)[:nedges].astype(bool).tolist()
+
+	with stage('construction'):
+		bm = bmesh.new()
+		maxx = max(v[0] for v in verts_stile)
+		offset = width/2 - abs(maxx)
+		hscale = height / (max(v[2] for v in verts_stile) - min(v[2] for v in verts_stile))
+		max_height = repetitions * height
+		edge_loops = []
+		stile_select = set()
+		for v in verts_stile:
+			bm.verts.new((v[0] - offset, v[1], v[2]))
+		bm.verts.ensure_lookup_table()
+		for n, e in enumerate(edges_stile):
+			bm.edges.new([bm.verts[e[0]], bm.verts[e[1]]])
+			if selected_stile[n]:
+				stile_select.update(e)
+			if crease_stile[n] > 0:
+				edge_loops.append(n)
+		bm.edges.ensure_lookup_table()
+		cl = bm.edges.layers.crease.new()
+		for n, e in enumerate(bm.edges):
+			e[cl] = crease_stile[n]
+		for f in faces_stile:
+			bm.faces.new([bm.verts[fi] for fi in f])
+		for v in stile_select:
+			bm.verts[v].co.z *= hscale
+		start_rung_verts = len(bm.verts)
+		start_rung_edges = len(bm.edges)
+		for v in profile.rung_verts.tolist():
+			bm.verts.new(v)
+		bm.verts.ensure_lookup_table()
+		for n, e in enumerate(profile.rung_edges.tolist()):
+			bm.edges.new([bm.verts[e[0] + start_rung_verts], bm.verts[e[1] + start_rung_verts]])
+			edge_loops.append(n + start_rung_edges)
+		bm.edges.ensure_lookup_table()
+	with stage('bridge_loops'):
+		bmesh.ops.bridge_loops(bm, edges=[bm.edges[e] for e in edge_loops])
+	with stage('duplicate'):
+		geom_orig = bm.verts[:] + bm.edges[:] + bm.faces[:]
+		for rep in range(1, repetitions):
+			ret = bmesh.ops.duplicate(bm, geom=geom_orig)
+			for ele in ret["geom"]:
+				if isinstance(ele, bmesh.types.BMVert):
+					ele.co.z += height * rep
+	with stage('construction'):
+		for f in bm.faces:
+			f.smooth = True
+		for v in bm.verts:
+			vtaper = (v.co.z / max_height) * (taper * 0.01)
+			if v.co.x < -0.001:
+				v.co.x += vtaper * width/2
+	with stage('remove_doubles'):
+		bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.001)
+	return bmesh_to_mesh(bm, 'X', stage)
+
+def bmesh_to_mesh(bm, mirror_axis, stage):
+	me = bpy.data.meshes.new('bench')
+	with stage('to_mesh'):
+		bm.to_mesh(me)
+		me.update()
+	bm.free()
+	evaluate_modifiers(me, mirror_axis, stage)
+	return len(me.vertices), len(me.edges), len(me.polygons)
+
+def evaluate_modifiers(me, mirror_axis, stage):
+	# the same modifier stack the addons add, evaluated like the viewport would
+	scene = bpy.context.scene
+	ob = bpy.data.objects.new('bench', me)
+	scene.objects.link(ob)
+	m = ob.modifiers.new('Mirror', 'MIRROR')
+	m.use_x = mirror_axis == 'X'
+	m.use_y = mirror_axis == 'Y'
+	m.use_z = False
+	m = ob.modifiers.new('Subsurf', 'SUBSURF')
+	m.levels = 2
+	with stage('modifiers'):
+		evaluated = ob.to_mesh(scene, True, 'PREVIEW')
+	bpy.data.meshes.remove(evaluated)
+	scene.objects.unlink(ob)
+	bpy.data.objects.remove(ob)
+
+GENERATORS = OrderedDict((
+	('ladder_05', run_ladder_05),
+	('hash_weld', run_hash_weld),
+	('ladder_04', run_ladder_04),
+	('legacy_05', run_legacy_05),
+))
+
+BLENDER_ONLY = {'ladder_04', 'legacy_05'}
+
+def cleanup():
+	# get rid of the meshes created by the previous run
+	if bpy is not None:
+		for me in [me for me in bpy.data.meshes if me.name.startswith('bench') and me.users == 0]:
+			bpy.data.meshes.remove(me)
+
+def run_case(generator, height, width, repetitions, taper, repeat):
+	run = GENERATORS[generator]
+
+	# one run with allocation tracing to measure the peak memory use. tracing
+	# slows down allocations so this run is not used for the timings
+	tracemalloc.start()
+	run(height, width, repetitions, taper, Stages())
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	cleanup()
+
+	# then the timed runs, of which we keep the fastest time per stage
+	best = None
+	for i in range(repeat):
+		stage = Stages()
+		verts, edges, faces = run(height, width, repetitions, taper, stage)
+		cleanup()
+		if best is None:
+			best = stage.times
+		else:
+			for name, t in stage.times.items():
+				best[name] = min(best[name], t)
+
+	total = sum(best.values())
+	return OrderedDict((
+		('generator', generator),
+		('repetitions', repetitions),
+		('width', width),
+		('taper', taper),
+		('height', height),
+		('verts', verts),
+		('edges', edges),
+		('faces', faces),
+		('stages', best),
+		('total', total),
+		('verts_per_second', verts / total if total > 0 else None),
+		('peak_bytes', peak),
+	))
+
+def case_key(result):
+	return (result['generator'], result['repetitions'], result['width'], result['taper'], result['height'])
+
+def compare(results, baseline, tolerance, min_seconds):
+	"""
+	Return a list of regression messages for results compared to baseline.
+
+	A stage regresses if it is more than tolerance (a fraction) slower than
+	in the baseline and also more than min_seconds slower, which keeps timer
+	noise on tiny cases from being reported. Element counts must match exactly.
+	"""
+	base = {case_key(r): r for r in baseline['results']}
+	regressions = []
+	for r in results:
+		b = base.get(case_key(r))
+		if b is None:
+			continue
+		name = "%s rungs=%d width=%g taper=%g" % (r['generator'], r['repetitions'], r['width'], r['taper'])
+		for count in ('verts', 'edges', 'faces'):
+			if r[count] != b[count]:
+				regressions.append("%s: %s changed from %d to %d" % (name, count, b[count], r[count]))
+		for stage, t in r['stages'].items():
+			bt = b['stages'].get(stage)
+			if bt is not None and t > bt * (1 + tolerance) and t - bt > min_seconds:
+				regressions.append("%s: %s took %.4fs, was %.4fs (%+.0f%%)" % (name, stage, t, bt, 100 * (t / bt - 1)))
+	return regressions
+
+def parse_args(argv):
+	parser = argparse.ArgumentParser(description='Benchmark the ladder generators')
+	parser.add_argument('--generators', nargs='+', choices=list(GENERATORS),
+		help='generators to run (default: all that are available)')
+	parser.add_argument('--repetitions', nargs='+', type=int, default=[1, 10, 100, 1000, 5000],
+		help='numbers of rungs to sweep')
+	parser.add_argument('--widths', nargs='+', type=float, default=[0.5],
+		help='ladder widths to sweep')
+	parser.add_argument('--tapers', nargs='+', type=float, default=[0, 50],
+		help='taper percentages to sweep')
+	parser.add_argument('--height', type=float, default=0.3,
+		help='step height')
+	parser.add_argument('--repeat', type=int, default=3,
+		help='timed runs per case, the fastest is reported')
+	parser.add_argument('--output',
+		help='write the results to this json file (default: stdout)')
+	parser.add_argument('--baseline',
+		help='compare against the results in this json file')
+	parser.add_argument('--tolerance', type=float, default=0.25,
+		help='allowed slowdown per stage as a fraction of the baseline')
+	parser.add_argument('--min-seconds', type=float, default=0.001,
+		help='slowdowns smaller than this are never reported')
+	return parser.parse_args(argv)
+
+def main(argv):
+	args = parse_args(argv)
+	available = [g for g in GENERATORS if bpy is not None or g not in BLENDER_ONLY]
+	generators = args.generators or available
+	for g in generators:
+		if g not in available:
+			sys.exit("generator %s needs Blender, run this script with blender -b --python" % g)
+
+	results = []
+	for generator in generators:
+		for repetitions in args.repetitions:
+			for width in args.widths:
+				for taper in args.tapers:
+					result = run_case(generator, args.height, width, repetitions, taper, args.repeat)
+					print("%-10s %5d rungs width %.2f taper %3g%%: %8.4fs %9d verts" % (
+						generator, repetitions, width, taper, result['total'], result['verts']), file=sys.stderr)
+					results.append(result)
+
+	try:
+		import resource
+		maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	except ImportError:
+		maxrss = None
+
+	report = OrderedDict((
+		('meta', OrderedDict((
+			('python', platform.python_version()),
+			('numpy', np.__version__),
+			('blender', bpy.app.version_string if bpy is not None else None),
+			('platform', platform.platform()),
+			('maxrss', maxrss),
+		))),
+		('results', results),
+	))
+	text = json.dumps(report, indent=1)
+	if args.output:
+		with open(args.output, 'w') as f:
+			f.write(text)
+	else:
+		print(text)
+
+	if args.baseline:
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+		regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+		for r in regressions:
+			print("REGRESSION", r, file=sys.stderr)
+		if regressions:
+			sys.exit(1)
+
+if __name__ == "__main__":
+	# when run by Blender our arguments follow a --, everything before it is Blender's
+	if '--' in sys.argv:
+		argv = sys.argv[sys.argv.index('--') + 1:]
+	else:
+		argv = [] if bpy is not None else sys.argv[1:]
+	main(argv)
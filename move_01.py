@@ -25,25 +25,100 @@ bl_info = {
 	"version": (0, 0, 20160104121212),
 	"blender": (2, 76, 0),
 	"location": "View3D > Object > Move",
-	"description": "Moves and object",
+	"description": "Moves the selected objects",
 	"warning": "",
 	"wiki_url": "",
 	"tracker_url": "",
 	"category": "Object"}
 
 import bpy
+from bpy.props import FloatVectorProperty, FloatProperty, IntProperty
+import numpy as np
+
+
+def parent_space(space, delta):
+    """
+    Map world space displacements to the parent space of each object.
+
+    space is an (n, 3, 3) stack of parent matrices and delta an (n, 3) array of
+    displacements. Each displacement is multiplied by the pseudo inverse of its
+    matrix, which is the inverse for invertible matrices. A parent may be
+    scaled to zero along some axis (e.g. animated), the child cannot move
+    along that axis then and only the rest of the displacement is applied.
+    """
+    # np.linalg.pinv only handles stacks of matrices in recent numpy
+    # versions, so the pseudo inverse is built from a stacked svd:
+    # pinv(A) = V diag(1/s) U^T, with 1/s set to 0 for vanishing s
+    u, s, vt = np.linalg.svd(space)
+    cutoff = 1e-10 * s.max(axis=1, keepdims=True)
+    s_inv = np.where(s > cutoff, 1 / np.where(s > cutoff, s, 1), 0)
+    return np.einsum('nji,nj,nkj,nk->ni', vt, s_inv, u, delta)
 
 
 class MoveObject(bpy.types.Operator):
-    """Moves an object"""
+    """Moves the selected objects"""
     bl_idname = "object.move_object"
-    bl_label = "Move an object"
+    bl_label = "Move selected objects"
     bl_options = {'REGISTER', 'UNDO'}
 
+    offset = FloatVectorProperty(name="Offset",
+                                 description="Distance to move every object",
+                                 default=(1, 0, 0),
+                                 subtype='TRANSLATION')
+
+    stride = FloatVectorProperty(name="Stride",
+                                 description="Extra distance added for each next object (sorted by name)",
+                                 default=(0, 0, 0),
+                                 subtype='TRANSLATION')
+
+    jitter = FloatProperty(name="Jitter",
+                           description="Maximum random distance added along each axis",
+                           default=0, min=0,
+                           subtype='DISTANCE')
+
+    seed = IntProperty(name="Seed",
+                       description="Random seed for the jitter",
+                       default=0, min=0)
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0 and context.mode == 'OBJECT'
+
     def execute(self, context):
-        context.active_object.location.x += 1
+        selected = set(context.selected_objects)
+        # a child of a selected object already moves with its parent
+        objects = sorted((ob for ob in selected if not self.moved_by_parent(ob, selected)),
+                         key=lambda ob: ob.name)
+        n = len(objects)
+
+        # the displacement of every object in world space
+        delta = np.tile(np.array(self.offset), (n, 1))
+        delta += np.arange(n)[:, None] * np.array(self.stride)
+        if self.jitter > 0:
+            delta += np.random.RandomState(self.seed).uniform(-self.jitter, self.jitter, (n, 3))
+
+        # the location of a parented object lives in the space of its parent
+        # (unparented objects use the identity)
+        space = np.tile(np.eye(3), (n, 1, 1))
+        for i, ob in enumerate(objects):
+            if ob.parent is not None:
+                space[i] = np.array((ob.parent.matrix_world * ob.matrix_parent_inverse).to_3x3())
+        delta = parent_space(space, delta)
+
+        location = np.array([ob.location for ob in objects]).reshape(n, 3) + delta
+        for ob, loc in zip(objects, location.tolist()):
+            ob.location = loc
         return {'FINISHED'}
 
+    @staticmethod
+    def moved_by_parent(ob, selected):
+        parent = ob.parent
+        while parent is not None:
+            if parent in selected:
+                return True
+            parent = parent.parent
+        return False
+
 
 # registering an operator is necessary so the user can find it
 # we create a wrapper function here so that we have a single
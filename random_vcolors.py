@@ -1,27 +1,254 @@
-from random import random
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  RandomVertexColors, a Blender addon
+#  (c) 2016 Michel J. Anders (varkenvarken)
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+bl_info = {
+	"name": "RandomVertexColors",
+	"author": "Michel Anders (varkenvarken)",
+	"version": (0, 0, 20160104121212),
+	"blender": (2, 76, 0),
+	"location": "View3D > Object > Random vertex colors",
+	"description": "Assigns random vertex colors per face, island or material",
+	"warning": "",
+	"wiki_url": "",
+	"tracker_url": "",
+	"category": "Mesh"}
+
+from concurrent.futures import ThreadPoolExecutor
+from zlib import crc32
+import os
+
 import bpy
-import bmesh
+from bpy.props import IntProperty, EnumProperty, BoolProperty
+import numpy as np
+
+# the number of faces processed at a time, this bounds the size of
+# the temporary arrays and sets the granularity of the progress bar
+CHUNK = 1 << 16
+
+
+def mesh_buffers(me, vcolor, strategy):
+    # everything the colors depend on, each read from the mesh in a single
+    # call. this is the only part that touches Blender data, so the colors
+    # themselves can be computed outside the main thread
+    buffers = {
+        # rgb in 2.7x, rgba in later versions
+        'components': len(vcolor.data[0].color),
+        'loops': len(vcolor.data),
+        # where the loops of every face start and how many there are
+        'loop_start': np.empty(len(me.polygons), dtype=np.int32),
+        'loop_total': np.empty(len(me.polygons), dtype=np.int32)}
+    me.polygons.foreach_get('loop_start', buffers['loop_start'])
+    me.polygons.foreach_get('loop_total', buffers['loop_total'])
+    if strategy == 'MATERIAL':
+        buffers['material_index'] = np.empty(len(me.polygons), dtype=np.int32)
+        me.polygons.foreach_get('material_index', buffers['material_index'])
+    elif strategy == 'ISLAND':
+        buffers['vertices'] = len(me.vertices)
+        buffers['edges'] = np.empty(2 * len(me.edges), dtype=np.int32)
+        me.edges.foreach_get('vertices', buffers['edges'])
+        buffers['loop_vertex'] = np.empty(len(me.loops), dtype=np.int32)
+        me.loops.foreach_get('vertex_index', buffers['loop_vertex'])
+    return buffers
+
+
+def union_find(n, u, v):
+    # a vectorized union-find: every round hooks the root of the higher
+    # numbered endpoint of each edge below the other root and then compresses
+    # all paths completely. edges whose endpoints share a root are dropped, so
+    # later rounds only see the edges that still join different trees. roots
+    # are only ever hooked below smaller roots, so in the end every element
+    # points at the lowest index in its component
+    parent = np.arange(n)
+    while len(u):
+        pu, pv = parent[u], parent[v]
+        joining = pu != pv
+        u, v, pu, pv = u[joining], v[joining], pu[joining], pv[joining]
+        np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def vertex_components(buffers):
+    # label the vertices by connected component
+    edges = buffers['edges']
+    roots = union_find(buffers['vertices'], edges[0::2], edges[1::2])
+    # renumber 0..n-1 in order of the lowest vertex index, which does not
+    # depend on anything but the mesh itself
+    components, labels = np.unique(roots, return_inverse=True)
+    return labels, len(components)
+
+
+def face_keys(buffers, strategy):
+    # the index into the color palette for every face
+    if strategy == 'MATERIAL':
+        keys = buffers['material_index']
+        return keys, keys.max() + 1 if len(keys) else 0
+    # the island of a face is the component of any of its vertices
+    labels, count = vertex_components(buffers)
+    return labels[buffers['loop_vertex'][buffers['loop_start']]], count
+
+
+def loop_colors(buffers, strategy, seed, progress=None):
+    # the color of every loop as a flat float32 array ready for foreach_set
+    components = buffers['components']
+    loop_start, loop_total = buffers['loop_start'], buffers['loop_total']
+    nfaces = len(loop_start)
+
+    # a legacy RandomState produces the same stream on every platform and
+    # numpy version, and drawing it in chunks yields the same values as
+    # drawing it at once, so the chunk size never changes the result
+    rng = np.random.RandomState(seed)
+    if strategy == 'FACE':
+        keys, palette = None, None
+    else:
+        keys, count = face_keys(buffers, strategy)
+        palette = rng.random_sample((count, components))
+        palette[:, 3:] = 1.0
+        palette = palette.astype(np.float32)
+
+    result = np.empty((buffers['loops'], components), dtype=np.float32)
+    for start in range(0, nfaces, CHUNK):
+        end = min(start + CHUNK, nfaces)
+        if keys is None:
+            colors = rng.random_sample((end - start, components))
+            colors[:, 3:] = 1.0
+            colors = colors.astype(np.float32)
+        else:
+            colors = palette[keys[start:end]]
+        # the loops of a face are contiguous but faces need not be stored
+        # in loop order, so scatter the colors to the actual loop indices
+        total = loop_total[start:end]
+        first = np.cumsum(total) - total
+        loops = np.repeat(loop_start[start:end] - first, total) + np.arange(total.sum())
+        result[loops] = np.repeat(colors, total, axis=0)
+        if progress:
+            progress(end)
+    return result.ravel()
+
+
+def mesh_seed(seed, me):
+    # every mesh gets its own stream derived from its name, so its colors do
+    # not depend on which other meshes are selected, in what order, or whether
+    # it is colored on its own or together with the rest of the selection
+    return (seed + crc32(me.name.encode('utf-8'))) & 0xffffffff
+
+
+class RandomVertexColors(bpy.types.Operator):
+    """Assign random vertex colors per face, island or material"""
+    bl_idname = "mesh.random_vertex_colors"
+    bl_label = "Random vertex colors"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    seed = IntProperty(name="Seed",
+                       description="The same seed always gives the same colors",
+                       default=0, min=0)
+
+    strategy = EnumProperty(name="Strategy",
+                            description="Which faces share a color",
+                            items=[
+                             ('FACE', 'Face', 'A random color for every face'),
+                             ('ISLAND', 'Island', 'A random color for every connected part'),
+                             ('MATERIAL', 'Material', 'A random color for every material slot')],
+                            default='FACE')
+
+    selected = BoolProperty(name="All selected",
+                            description="Color the meshes of all selected objects instead of just the active one",
+                            default=False)
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    def execute(self, context):
+        ob = context.active_object
+        # the color layer of a mesh in edit mode is overwritten when leaving it
+        editmode = ob.mode == 'EDIT'
+        if editmode:
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        if self.selected:
+            self.colorize_selected(context)
+        else:
+            self.colorize(context, ob.data)
+
+        if editmode:
+            bpy.ops.object.mode_set(mode='EDIT')
+        return {'FINISHED'}
+
+    def color_layer(self, me):
+        vcolor = me.vertex_colors.active
+        if vcolor is None:
+            vcolor = me.vertex_colors.new()
+        return vcolor
+
+    def colorize(self, context, me):
+        vcolor = self.color_layer(me)
+        if len(vcolor.data):
+            buffers = mesh_buffers(me, vcolor, self.strategy)
+            wm = context.window_manager
+            wm.progress_begin(0, len(buffers['loop_start']))
+            colors = loop_colors(buffers, self.strategy, mesh_seed(self.seed, me), wm.progress_update)
+            wm.progress_end()
+            vcolor.data.foreach_set('color', colors)
+        me.update()
+
+    def colorize_selected(self, context):
+        # objects may share a mesh, color every mesh just once
+        meshes = {ob.data for ob in context.selected_objects if ob.type == 'MESH'}
+        meshes = sorted(meshes, key=lambda me: me.name)
+        layers = [(me, self.color_layer(me)) for me in meshes]
+        layers = [(me, vcolor) for me, vcolor in layers if len(vcolor.data)]
+
+        # reading and writing Blender data happens on the main thread, the
+        # colors are computed by a pool of threads in the mean time (numpy
+        # releases the GIL in most of the heavy lifting)
+        wm = context.window_manager
+        wm.progress_begin(0, len(layers))
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            jobs = [pool.submit(loop_colors, mesh_buffers(me, vcolor, self.strategy),
+                                self.strategy, mesh_seed(self.seed, me))
+                    for me, vcolor in layers]
+            for n, ((me, vcolor), job) in enumerate(zip(layers, jobs)):
+                vcolor.data.foreach_set('color', job.result())
+                wm.progress_update(n + 1)
+        wm.progress_end()
 
-C = bpy.context
+        for me in meshes:
+            me.update()
 
-bm = bmesh.new()
 
-bm.from_mesh(C.object.data)
-bm.faces.ensure_lookup_table()
+def register():
+    bpy.utils.register_module(__name__)
+    bpy.types.VIEW3D_MT_object.append(menu_func)
 
-vcolor = bm.loops.layers.color.active
-if vcolor is None:
-    vcolor = bm.loops.layers.color.new()
-    
-for face in bm.faces:
-    color = (random(), random(), random())
-    for loop in face.loops:
-        loop[vcolor] = color
+def unregister():
+    bpy.utils.unregister_module(__name__)
+    bpy.types.VIEW3D_MT_object.remove(menu_func)
 
-bm.to_mesh(C.object.data)
-bm.free()
+def menu_func(self, context):
+	self.layout.operator(RandomVertexColors.bl_idname, icon='COLOR')
 
-for w in C.window_manager.windows:
-    for a in w.screen.areas:
-        if a.type == 'VIEW_3D':
-            a.tag_redraw()
\ No newline at end of file
+if __name__ == "__main__":
+    register()
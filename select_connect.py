@@ -1,25 +1,449 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  SelectConnect, a Blender addon
+#  (c) 2016 Michel J. Anders (varkenvarken)
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+bl_info = {
+	"name": "SelectConnect",
+	"author": "Michel Anders (varkenvarken)",
+	"version": (0, 0, 20160104121212),
+	"blender": (2, 76, 0),
+	"location": "View3D > Select > Select connected (cached)",
+	"description": "Selects everything connected to the current selection",
+	"warning": "",
+	"wiki_url": "",
+	"tracker_url": "",
+	"category": "Mesh"}
+
+from collections import OrderedDict
+from zlib import crc32
+
 import bpy
-import bmesh
+from bpy.props import IntProperty, FloatProperty, EnumProperty
+from bpy.app.handlers import persistent
+import numpy as np
+
+
+def union_find(n, u, v):
+    # a vectorized union-find: every round hooks the root of the higher
+    # numbered endpoint of each edge below the other root and then compresses
+    # all paths completely. edges whose endpoints share a root are dropped, so
+    # later rounds only see the edges that still join different trees
+    parent = np.arange(n)
+    while len(u):
+        pu, pv = parent[u], parent[v]
+        joining = pu != pv
+        u, v, pu, pv = u[joining], v[joining], pu[joining], pv[joining]
+        np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def adjacency(nverts, edges):
+    # compressed sparse row adjacency: the neighbours of vertex i are
+    # indices[indptr[i]:indptr[i+1]], connected by the edges in the same
+    # positions of edge_ids
+    u, v = edges[0::2], edges[1::2]
+    src = np.concatenate((u, v))
+    dst = np.concatenate((v, u))
+    order = np.argsort(src, kind='mergesort')
+    indptr = np.zeros(nverts + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=nverts), out=indptr[1:])
+    return indptr, dst[order], (order % len(u)).astype(np.int32)
+
+
+def neighbours(indptr, rows):
+    # the positions of the neighbour lists of all rows, concatenated, and
+    # the row each position belongs to, gathered without a python loop
+    start = indptr[rows]
+    count = indptr[rows + 1] - start
+    first = np.cumsum(count) - count
+    return np.repeat(start - first, count) + np.arange(count.sum()), np.repeat(rows, count)
+
+
+def expand(adjacency, frontier, blocked):
+    # the edges leaving the frontier that may be crossed, as (from, to, edge)
+    indptr, indices, edge_ids = adjacency
+    positions, rows = neighbours(indptr, frontier)
+    edge = edge_ids[positions]
+    if blocked is not None:
+        passable = ~blocked[edge]
+        positions, rows, edge = positions[passable], rows[passable], edge[passable]
+    return rows, indices[positions], edge
+
+
+def grow(adjacency, seeds, steps=-1, blocked=None, stops=None):
+    # level synchronous breadth first growth, one ring per step (or until
+    # nothing new is reached when steps is negative). the work done is
+    # proportional to the edges around the reached region. blocked edges are
+    # never crossed and vertices marked in stops are reached but not left
+    reached = seeds.copy()
+    frontier = np.flatnonzero(seeds)
+    while len(frontier) and steps != 0:
+        _, candidates, _ = expand(adjacency, frontier, blocked)
+        frontier = np.unique(candidates[~reached[candidates]])
+        reached[frontier] = True
+        if stops is not None:
+            frontier = frontier[~stops[frontier]]
+        steps -= 1
+    return reached
+
+
+def grow_within(adjacency, co, seeds, radius, blocked=None, stops=None):
+    # like grow() but up to a distance measured along the edges from the
+    # nearest seed. every round relaxes the edges leaving the vertices whose
+    # distance just improved, so only the region within radius is visited
+    distance = np.full(len(seeds), np.inf)
+    distance[seeds] = 0
+    frontier = np.flatnonzero(seeds)
+    while len(frontier):
+        rows, candidates, _ = expand(adjacency, frontier, blocked)
+        d = distance[rows] + np.linalg.norm(co[candidates] - co[rows], axis=1)
+        closer = (d < distance[candidates]) & (d <= radius)
+        candidates, d = candidates[closer], d[closer]
+        np.minimum.at(distance, candidates, d)
+        frontier = np.unique(candidates)
+        if stops is not None:
+            frontier = frontier[~stops[frontier]]
+    return distance <= radius
+
+
+class MeshArrays:
+    """The topology of a mesh as flat arrays, each read in a single call"""
+
+    def __init__(self, me):
+        self.nverts, self.nedges, self.nfaces = len(me.vertices), len(me.edges), len(me.polygons)
+        self.edges = np.empty(2 * self.nedges, dtype=np.int32)
+        me.edges.foreach_get('vertices', self.edges)
+        self.loop_vertex = np.empty(len(me.loops), dtype=np.int32)
+        me.loops.foreach_get('vertex_index', self.loop_vertex)
+        self.loop_edge = np.empty(len(me.loops), dtype=np.int32)
+        me.loops.foreach_get('edge_index', self.loop_edge)
+
+        # the face index of every loop
+        loop_start = np.empty(self.nfaces, dtype=np.int32)
+        loop_total = np.empty(self.nfaces, dtype=np.int32)
+        me.polygons.foreach_get('loop_start', loop_start)
+        me.polygons.foreach_get('loop_total', loop_total)
+        first = np.cumsum(loop_total) - loop_total
+        loops = np.repeat(loop_start - first, loop_total) + np.arange(len(me.loops))
+        self.loop_face = np.empty(len(me.loops), dtype=np.int32)
+        self.loop_face[loops] = np.repeat(np.arange(self.nfaces, dtype=np.int32), loop_total)
+
+    def count(self, kind):
+        return {'VERT': self.nverts, 'EDGE': self.nedges, 'FACE': self.nfaces}[kind]
+
+    def graph(self, kind):
+        # the connectivity in the given select mode as (nodes, node pairs).
+        # vertices are connected by edges. edges and faces are connected
+        # through the vertices and edges they share, which are added as extra
+        # nodes after the elements themselves, so one step from element to
+        # element takes two steps through this graph
+        if kind == 'VERT':
+            return self.nverts, self.edges
+        if kind == 'EDGE':
+            element = np.repeat(np.arange(self.nedges, dtype=np.int32), 2)
+            shared = self.nedges + self.edges
+        else:
+            element = self.loop_face
+            shared = self.nfaces + self.loop_edge
+        nnodes = self.nedges + self.nverts if kind == 'EDGE' else self.nfaces + self.nedges
+        return nnodes, np.column_stack((element, shared)).ravel()
+
+    def positions(self, kind, co):
+        # the location of every node in graph(kind)
+        midpoints = (co[self.edges[0::2]] + co[self.edges[1::2]]) / 2
+        if kind == 'VERT':
+            return co
+        if kind == 'EDGE':
+            return np.concatenate((midpoints, co))
+        centers = np.zeros((self.nfaces, 3))
+        np.add.at(centers, self.loop_face, co[self.loop_vertex])
+        centers /= np.bincount(self.loop_face, minlength=self.nfaces)[:, None]
+        return np.concatenate((centers, midpoints))
+
+    def flush(self, kind, selected):
+        # the complete vertex, edge and face selection that follows from
+        # selecting elements of one kind, the same as Blender's own flush
+        if kind == 'VERT':
+            verts = selected
+            edges = verts[self.edges[0::2]] & verts[self.edges[1::2]]
+        elif kind == 'EDGE':
+            edges = selected
+            verts = edge_vertices(self.nverts, self.edges, edges)
+        else:
+            chosen = selected[self.loop_face]
+            verts = np.zeros(self.nverts, dtype=bool)
+            verts[self.loop_vertex[chosen]] = True
+            edges = np.zeros(self.nedges, dtype=bool)
+            edges[self.loop_edge[chosen]] = True
+            return verts, edges, selected
+        # a face is selected when all of its vertices (or edges) are
+        element = verts[self.loop_vertex] if kind == 'VERT' else edges[self.loop_edge]
+        unselected = np.bincount(self.loop_face, weights=~element, minlength=self.nfaces)
+        return verts, edges, unselected == 0
+
+
+def delimiting_edges(me, arrays, delimit):
+    # the edges that may not be crossed, or None if there are no delimiters
+    if not delimit:
+        return None
+    blocked = np.zeros(len(me.edges), dtype=bool)
+    flag = np.empty(len(me.edges), dtype=bool)
+    for name, attribute in (('SEAM', 'use_seam'), ('SHARP', 'use_edge_sharp')):
+        if name in delimit:
+            me.edges.foreach_get(attribute, flag)
+            blocked |= flag
+    if 'MATERIAL' in delimit and len(me.polygons):
+        # an edge is a boundary when the faces around it use different materials
+        material = np.empty(len(me.polygons), dtype=np.int32)
+        me.polygons.foreach_get('material_index', material)
+        loop_material = material[arrays.loop_face]
+        lowest = np.full(len(me.edges), np.iinfo(np.int32).max, dtype=np.int32)
+        highest = np.full(len(me.edges), -1, dtype=np.int32)
+        np.minimum.at(lowest, arrays.loop_edge, loop_material)
+        np.maximum.at(highest, arrays.loop_edge, loop_material)
+        blocked |= (highest >= 0) & (lowest != highest)
+    return blocked
+
+
+def edge_vertices(nverts, edges, mask):
+    # the vertices that belong to any of the masked edges
+    touched = np.zeros(nverts, dtype=bool)
+    touched[edges[0::2][mask]] = True
+    touched[edges[1::2][mask]] = True
+    return touched
+
+
+def write_selection(me, verts, edges, faces):
+    # vertices, edges and faces are all written at once and agree with each
+    # other, so nothing has to be flushed when edit mode is entered again
+    me.vertices.foreach_set('select', verts)
+    me.edges.foreach_set('select', edges)
+    me.polygons.foreach_set('select', faces)
+
+
+class Topology:
+    """The adjacency and component labels of a graph, built on first use"""
+
+    def __init__(self, nnodes, pairs):
+        self.nnodes = nnodes
+        self.pairs = pairs
+        self._adjacency = None
+        self._labels = None
+
+    @property
+    def adjacency(self):
+        # needed when growing the selection step by step
+        if self._adjacency is None:
+            self._adjacency = adjacency(self.nnodes, self.pairs)
+        return self._adjacency
+
+    @property
+    def labels(self):
+        # the component of every node, selecting connected geometry with
+        # these is a lookup instead of a flood fill
+        if self._labels is None:
+            self._labels = union_find(self.nnodes, self.pairs[0::2], self.pairs[1::2])
+        return self._labels
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.pairs, self._labels) + (self._adjacency or ()) if a is not None)
+
+
+class TopologyCache:
+    """A least recently used cache of mesh topologies, bounded in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+
+    def get(self, me, kind, nnodes, pairs):
+        # a mesh is identified by its address and the select mode, and the
+        # topology is only reused when the node and pair counts and a checksum
+        # of the pairs still match
+        key = (me.as_pointer(), kind)
+        fingerprint = (nnodes, len(pairs), crc32(pairs.tobytes()))
+        entry = self.entries.pop(key, None)
+        if entry is None or entry[0] != fingerprint:
+            entry = (fingerprint, Topology(nnodes, pairs))
+        self.entries[key] = entry
+        return entry[1]
+
+    def trim(self, keep=None):
+        # drop meshes that no longer exist and then the least recently used
+        # ones until the cache fits (the one we are working with is kept)
+        alive = {me.as_pointer() for me in bpy.data.meshes}
+        for key in [key for key in self.entries if key[0] not in alive]:
+            del self.entries[key]
+        total = sum(topology.nbytes for _, topology in self.entries.values())
+        for key in list(self.entries):
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                total -= self.entries.pop(key)[1].nbytes
+
+    def clear(self):
+        self.entries.clear()
+
+
+topology_cache = TopologyCache(256 << 20)
+
+
+class SelectConnect(bpy.types.Operator):
+    """Select everything connected to the selected vertices"""
+    bl_idname = "mesh.select_connect"
+    bl_label = "Select connected (cached)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode = EnumProperty(name="Mode",
+                        description="How far to grow the selection",
+                        items=[
+                         ('ALL', 'All', 'Everything that is connected'),
+                         ('RINGS', 'Rings', 'A number of edge steps'),
+                         ('RADIUS', 'Radius', 'Up to a distance measured along the edges')],
+                        default='ALL')
+
+    rings = IntProperty(name="Rings",
+                        description="Number of edge steps to grow",
+                        default=1, min=1)
+
+    radius = FloatProperty(name="Radius",
+                           description="Distance along the edges to grow",
+                           default=1, min=0,
+                           subtype='DISTANCE', unit='LENGTH')
+
+    delimit = EnumProperty(name="Delimit",
+                           description="Stop growing at these edges",
+                           items=[
+                            ('SEAM', 'Seam', 'Stop at uv seams'),
+                            ('SHARP', 'Sharp', 'Stop at sharp edges'),
+                            ('MATERIAL', 'Material', 'Stop where the material changes')],
+                           options={'ENUM_FLAG'},
+                           default=set())
+
+    @classmethod
+    def poll(cls, context):
+        return (context.active_object is not None
+                and context.active_object.type == 'MESH'
+                and context.mode == 'EDIT_MESH')
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, 'mode')
+        if self.mode == 'RINGS':
+            layout.prop(self, 'rings')
+        elif self.mode == 'RADIUS':
+            layout.prop(self, 'radius')
+        layout.prop(self, 'delimit')
+
+    def execute(self, context):
+        # connectivity follows the active select mode, vertices first as in
+        # Blender itself when several modes are enabled
+        vert_mode, edge_mode, face_mode = context.tool_settings.mesh_select_mode
+        kind = 'VERT' if vert_mode else 'EDGE' if edge_mode else 'FACE'
+
+        # mesh data can only be read and written in bulk outside of edit mode
+        bpy.ops.object.mode_set(mode='OBJECT')
+        me = context.active_object.data
+        arrays = MeshArrays(me)
+
+        elements = {'VERT': me.vertices, 'EDGE': me.edges, 'FACE': me.polygons}[kind]
+        selected = np.empty(len(elements), dtype=bool)
+        elements.foreach_get('select', selected)
+
+        nnodes, pairs = arrays.graph(kind)
+        topology = topology_cache.get(me, kind, nnodes, pairs)
+        selected = self.select(me, arrays, kind, topology, selected)
+        write_selection(me, *arrays.flush(kind, selected))
+        topology_cache.trim(keep=(me.as_pointer(), kind))
+
+        bpy.ops.object.mode_set(mode='EDIT')
+        return {'FINISHED'}
+
+    def select(self, me, arrays, kind, topology, selected):
+        n = len(selected)
+        # the seeds as nodes of the graph, the shared vertices or edges
+        # of the edge and face modes start out unselected
+        seeds = np.zeros(topology.nnodes, dtype=bool)
+        seeds[:n] = selected
+        blocked = delimiting_edges(me, arrays, self.delimit)
+        if self.mode == 'ALL' and blocked is None:
+            # the labels are node indices, so marking the components of
+            # the seeds is a plain scatter and gather
+            labels = topology.labels
+            components = np.zeros(len(labels), dtype=bool)
+            components[labels[seeds]] = True
+            return components[labels[:n]]
+
+        # nodes on a delimiting edge are selected but growth stops there,
+        # otherwise it would continue along the edges on the other side. in
+        # vertex mode the delimiting edges themselves are not crossed either,
+        # in edge mode the shared vertices on them are where growth stops
+        stops, crossing = None, None
+        if blocked is not None:
+            stops = np.zeros(topology.nnodes, dtype=bool)
+            if kind == 'VERT':
+                stops[:] = edge_vertices(n, arrays.edges, blocked)
+                crossing = blocked
+            elif kind == 'EDGE':
+                stops[:n] = blocked
+                stops[n:] = edge_vertices(arrays.nverts, arrays.edges, blocked)
+            else:
+                stops[n:] = blocked
+
+        if self.mode == 'RADIUS':
+            co = np.empty(3 * len(me.vertices), dtype=np.float32)
+            me.vertices.foreach_get('co', co)
+            co = arrays.positions(kind, co.reshape(-1, 3).astype(np.float64))
+            reached = grow_within(topology.adjacency, co, seeds, self.radius, crossing, stops)
+        else:
+            # a ring of edges or faces is two steps through the shared nodes
+            steps = self.rings * (1 if kind == 'VERT' else 2) if self.mode == 'RINGS' else -1
+            reached = grow(topology.adjacency, seeds, steps, crossing, stops)
+        return reached[:n]
+
 
-C = bpy.context
+@persistent
+def clear_topology_cache(dummy):
+    # after loading a file mesh addresses may be reused by different meshes
+    topology_cache.clear()
 
-bm = bmesh.from_edit_mesh(C.object.data)
 
-to_visit = []
+def register():
+    bpy.utils.register_module(__name__)
+    bpy.types.VIEW3D_MT_select_edit_mesh.append(menu_func)
+    bpy.app.handlers.load_post.append(clear_topology_cache)
 
-for v in bm.verts:
-    v.tag = False
-    if v.select :
-        to_visit.append(v)
+def unregister():
+    bpy.utils.unregister_module(__name__)
+    bpy.types.VIEW3D_MT_select_edit_mesh.remove(menu_func)
+    bpy.app.handlers.load_post.remove(clear_topology_cache)
+    topology_cache.clear()
 
-while to_visit:
-    v = to_visit.pop()
-    if v.tag : continue
-    v.tag = True
-    for e in v.link_edges:
-        v2 = e.other_vert(v)
-        if not v2.tag :
-            v2.select = True
-            to_visit.append(v2)
+def menu_func(self, context):
+	self.layout.operator(SelectConnect.bl_idname)
 
-bmesh.update_edit_mesh(C.object.data)
\ No newline at end of file
+if __name__ == "__main__":
+    register()
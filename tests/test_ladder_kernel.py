@@ -0,0 +1,245 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+
+def load_kernel():
+    # load ladder_05/kernel.py by path so we do not need bpy to import the package
+    path = os.path.join(os.path.dirname(__file__), '..', 'ladder_05', 'kernel.py')
+    spec = importlib.util.spec_from_file_location('ladder_kernel', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+kernel = load_kernel()
+
+# the stile and rung tables of the original bmesh based ladder_05
+vertsStile = [(-0.07573,0.03,-0.05),(-0.07573,0.03,0.05),(-0.04975,0.015,-0.05),(-0.04975,0.015,0.05),(-0.04975,-0.015,-0.05),(-0.04975,-0.015,0.05),(-0.07573,-0.03,-0.05),(-0.07573,-0.03,0.05),(-0.1017,-0.015,-0.05),(-0.1017,-0.015,0.05),(-0.1017,0.015,-0.05),(-0.1017,0.015,0.05),(-0.07573,0.03,-0.01667),(-0.07573,0.03,0.01667),(-0.04975,0.015,0.01667),(-0.04975,0.015,-0.01667),(-0.04975,-0.015,0.01667),(-0.04975,-0.015,-0.01667),(-0.07573,-0.03,0.01667),(-0.07573,-0.03,-0.01667),(-0.1017,-0.015,0.01667),(-0.1017,-0.015,-0.01667),(-0.1017,0.015,0.01667),(-0.1017,0.015,-0.01667),]
+
+facesStile = [(13, 1, 3, 14),(14, 3, 5, 16),(16, 5, 7, 18),(18, 7, 9, 20),(20, 9, 11, 22),(22, 11, 1, 13),(10, 23, 12, 0),(23, 22, 13, 12),(8, 21, 23, 10),(21, 20, 22, 23),(6, 19, 21, 8),(19, 18, 20, 21),(4, 17, 19, 6),(17, 16, 18, 19),(2, 15, 17, 4),(0, 12, 15, 2),(12, 13, 14, 15),]
+
+edgesStile = [(2, 0),(13, 1),(1, 3),(15, 2),(4, 2),(3, 5),(17, 4),(6, 4),(5, 7),(19, 6),(8, 6),(7, 9),(21, 8),(10, 8),(9, 11),(23, 10),(0, 10),(11, 1),(0, 12),(12, 13),(3, 14),(14, 15),(5, 16),(16, 17),(7, 18),(18, 19),(9, 20),(20, 21),(11, 22),(22, 23),(23, 12),(22, 13),(21, 23),(20, 22),(19, 21),(18, 20),(17, 19),(16, 18),(15, 17),(14, 16),(12, 15),(13, 14),]
+
+creasedStile = {21, 23, 38, 39}
+
+selectedStile = {0, 2, 4, 5, 7, 8, 10, 11, 13, 14, 16, 17}
+
+vertsRung = [(0,0.0187,0.01781),(0,0.0187,-0.01552),(0,-0.0113,0.01781),(0,-0.0113,-0.01552),]
+
+edgesRung = [(0, 1),(2, 3),(1, 3),(0, 2),]
+
+HEIGHT, WIDTH = 0.3, 0.5
+
+
+def check_mesh(geom):
+    # structural checks that hold for any valid closed-or-open 2-manifold
+    nverts = len(geom.verts)
+    edges = geom.edges
+    assert (edges >= 0).all() and (edges < nverts).all()
+    assert (edges[:, 0] != edges[:, 1]).all()
+    codes = np.sort(edges, axis=1)
+    codes = codes[:, 0] * nverts + codes[:, 1]
+    assert len(np.unique(codes)) == len(edges), "duplicate edges"
+
+    assert len(geom.loop_start) == len(geom.loop_total)
+    assert np.array_equal(geom.loop_start, np.concatenate(([0], np.cumsum(geom.loop_total)[:-1])))
+    assert geom.loop_total.sum() == len(geom.loops) == len(geom.loop_edges)
+    assert (geom.loop_total >= 3).all()
+
+    # the edge of every loop runs from its vertex to the next one in the face
+    nxt = np.arange(len(geom.loops)) + 1
+    last = geom.loop_start + geom.loop_total - 1
+    nxt[last] = geom.loop_start
+    loop_edges = edges[geom.loop_edges]
+    pair = np.sort(np.column_stack((geom.loops, geom.loops[nxt])), axis=1)
+    assert np.array_equal(np.sort(loop_edges, axis=1), pair)
+
+    # manifold: no edge is used by more than two faces
+    uses = np.bincount(geom.loop_edges, minlength=len(edges))
+    assert uses.max() <= 2
+
+    # consistent winding: every directed edge occurs at most once, so two
+    # faces sharing an edge run along it in opposite directions
+    directed = geom.loops.astype(np.int64) * nverts + geom.loops[nxt]
+    assert len(np.unique(directed)) == len(directed)
+
+
+def shifted_copies(geom, repetitions):
+    # the original ladder: stack unwelded copies of one segment
+    n = len(geom.verts)
+    m = len(geom.edges)
+    verts = np.concatenate([geom.verts + (0, 0, HEIGHT * r) for r in range(repetitions)])
+    return kernel.Geometry(verts.astype(np.float32),
+                           np.concatenate([geom.edges + n * r for r in range(repetitions)]),
+                           np.tile(geom.creases, repetitions),
+                           np.concatenate([geom.loops + n * r for r in range(repetitions)]),
+                           np.concatenate([geom.loop_edges + m * r for r in range(repetitions)]),
+                           np.concatenate([geom.loop_start + len(geom.loops) * r for r in range(repetitions)]),
+                           np.tile(geom.loop_total, repetitions))
+
+
+def sorted_rows(a, decimals=5):
+    a = np.round(np.asarray(a, dtype=np.float64), decimals) + 0.0
+    return a[np.lexsort(a.T[::-1])]
+
+
+def test_default_profile_matches_baseline_tables():
+    profile = kernel.load_profile()
+    assert np.allclose(profile.stile_verts, vertsStile)
+    assert np.array_equal(profile.stile_edges, edgesStile)
+    assert np.array_equal(profile.stile_loops, [v for f in facesStile for v in f])
+    assert np.array_equal(profile.stile_loop_total, [len(f) for f in facesStile])
+    crease = np.unpackbits(profile.crease)[:len(edgesStile)]
+    select = np.unpackbits(profile.select)[:len(edgesStile)]
+    assert set(np.flatnonzero(crease)) == creasedStile
+    assert set(np.flatnonzero(select)) == selectedStile
+    assert np.allclose(profile.rung_verts, vertsRung)
+    assert np.array_equal(profile.rung_edges, edgesRung)
+
+
+def test_segment_contains_baseline_stile():
+    # one segment holds the stile of the tables, moved to the width and
+    # stretched to the step height exactly like the bmesh version did
+    geom = kernel.geometry(HEIGHT, WIDTH, 1, 0)
+    stile = np.array(vertsStile)
+    stretched = {v for e in np.array(edgesStile)[sorted(selectedStile)] for v in e}
+    stile[:, 0] -= WIDTH / 2 - abs(stile[:, 0].max())
+    stile[sorted(stretched), 2] *= HEIGHT / 0.1
+    found = sorted_rows(geom.verts)
+    for v in stile:
+        assert np.isclose(found, v, atol=1e-5).all(axis=1).any()
+
+
+@pytest.mark.parametrize('repetitions', [1, 2, 3, 7])
+def test_counts(repetitions):
+    geom = kernel.geometry(HEIGHT, WIDTH, repetitions, 0)
+    expected = (6 + 22 * repetitions, 6 + 44 * repetitions, 84 * repetitions, 21 * repetitions)
+    assert kernel.counts(repetitions) == expected
+    assert (len(geom.verts), len(geom.edges), len(geom.loops), len(geom.loop_start)) == expected
+
+
+@pytest.mark.parametrize('repetitions', [1, 4])
+@pytest.mark.parametrize('taper', [0, 30])
+def test_manifold_and_winding(repetitions, taper):
+    check_mesh(kernel.geometry(HEIGHT, WIDTH, repetitions, taper))
+
+
+def test_creases_follow_the_rung_holes():
+    geom = kernel.geometry(HEIGHT, WIDTH, 3, 0)
+    assert set(np.unique(geom.creases)) <= {0.0, 1.0}
+    # the four edges around the hole of the rung in every segment
+    assert (geom.creases == 1).sum() == 4 * 3
+
+
+def test_welded_by_index_matches_remove_doubles():
+    # the original generator duplicated one segment and removed doubles
+    # afterwards, the kernel has to give the same mesh without that step
+    segment = kernel.geometry(HEIGHT, WIDTH, 1, 0)
+    for repetitions in (2, 5):
+        geom = kernel.geometry(HEIGHT, WIDTH, repetitions, 0)
+        welded = kernel.weld(shifted_copies(segment, repetitions), 0.001)
+        assert len(welded.verts) == len(geom.verts)
+        assert len(welded.edges) == len(geom.edges)
+        assert len(welded.loop_start) == len(geom.loop_start)
+        assert np.allclose(sorted_rows(welded.verts), sorted_rows(geom.verts), atol=1e-5)
+        check_mesh(welded)
+
+
+def test_weld_is_a_no_op_on_welded_geometry():
+    geom = kernel.geometry(HEIGHT, WIDTH, 4, 10)
+    welded = kernel.weld(geom, 0.001)
+    # weld() keeps the vertex order but renumbers the edges in sorted order
+    assert np.array_equal(welded.verts, geom.verts)
+    assert np.array_equal(welded.loops, geom.loops)
+    assert np.array_equal(sorted_rows(np.sort(welded.edges, axis=1)), sorted_rows(np.sort(geom.edges, axis=1)))
+    assert np.array_equal(np.sort(welded.edges[welded.loop_edges], axis=1), np.sort(geom.edges[geom.loop_edges], axis=1))
+
+
+def test_weld_merges_coincident_vertices():
+    # two triangles sharing an edge, stored with separate vertices
+    verts = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0),
+                      (1, 0, 0.0001), (1, 1, 0), (0, 1, 0)], dtype=np.float32)
+    edges = np.array([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)], dtype=np.int32)
+    geom = kernel.Geometry(verts, edges, np.array([0, 1, 0, 0, 0, 0], dtype=np.float32),
+                           np.array([0, 1, 2, 3, 4, 5], dtype=np.int32),
+                           np.array([0, 1, 2, 3, 4, 5], dtype=np.int32),
+                           np.array([0, 3], dtype=np.int32),
+                           np.array([3, 3], dtype=np.int32))
+    welded = kernel.weld(geom, 0.001)
+    assert len(welded.verts) == 4
+    # the shared diagonal becomes a single edge that keeps its crease
+    assert len(welded.edges) == 5
+    assert welded.creases.max() == 1
+    check_mesh(welded)
+
+
+def test_weld_drops_collapsed_faces():
+    verts = np.array([(0, 0, 0), (1, 0, 0), (1, 0.0001, 0)], dtype=np.float32)
+    geom = kernel.Geometry(verts, np.array([(0, 1), (1, 2), (2, 0)], dtype=np.int32),
+                           np.zeros(3, dtype=np.float32),
+                           np.array([0, 1, 2], dtype=np.int32),
+                           np.array([0, 1, 2], dtype=np.int32),
+                           np.array([0], dtype=np.int32),
+                           np.array([3], dtype=np.int32))
+    welded = kernel.weld(geom, 0.001)
+    assert len(welded.verts) == 2
+    assert len(welded.edges) == 1
+    assert len(welded.loop_start) == 0
+
+
+def test_fewer_rungs_are_a_prefix():
+    # the incremental mesh update relies on this: a ladder with more rungs
+    # starts with exactly the elements of a ladder with fewer
+    full = kernel.geometry(HEIGHT, WIDTH, 6, 0)
+    for repetitions in range(1, 6):
+        part = kernel.geometry(HEIGHT, WIDTH, repetitions, 0)
+        nverts, nedges, nloops, nfaces = kernel.counts(repetitions)
+        assert np.array_equal(full.verts[:nverts], part.verts)
+        assert np.array_equal(full.edges[:nedges], part.edges)
+        assert np.array_equal(full.creases[:nedges], part.creases)
+        assert np.array_equal(full.loops[:nloops], part.loops)
+        assert np.array_equal(full.loop_edges[:nloops], part.loop_edges)
+        assert np.array_equal(full.loop_start[:nfaces], part.loop_start)
+        assert np.array_equal(full.loop_total[:nfaces], part.loop_total)
+
+
+def test_cache_key_quantizes_float_noise():
+    a = kernel.cache_key(HEIGHT, WIDTH, 3, 0)
+    b = kernel.cache_key(HEIGHT + 1e-9, WIDTH - 1e-9, 3, 0)
+    assert a == b
+    assert a != kernel.cache_key(HEIGHT, WIDTH, 4, 0)
+
+
+def profile_with(**changes):
+    # the default profile as make_profile() arguments, with some of them replaced
+    nedges = len(edgesStile)
+    args = dict(stile_verts=vertsStile, stile_edges=edgesStile, stile_faces=facesStile,
+                creased=[n in creasedStile for n in range(nedges)],
+                selected=[n in selectedStile for n in range(nedges)],
+                rung_verts=vertsRung, rung_edges=edgesRung)
+    args.update(changes)
+    return kernel.make_profile('test', **args)
+
+
+def test_profile_round_trips_through_make_profile():
+    assert profile_with().digest == kernel.load_profile().digest
+
+
+@pytest.mark.parametrize('changes', [
+    # no creased edges at all
+    dict(creased=[False] * len(edgesStile)),
+    # a creased loop that is one edge short of the rung loop
+    dict(rung_verts=vertsRung + [(0, 0.03, 0)], rung_edges=[(0, 1), (2, 3), (1, 3), (0, 4), (4, 2)]),
+    # the creased edges do not close
+    dict(creased=[n in creasedStile - {21} for n in range(len(edgesStile))]),
+    # indices out of range
+    dict(stile_edges=edgesStile[:-1] + [(13, 24)]),
+    dict(stile_faces=facesStile[:-1] + [(12, 13, 14, 99)]),
+    dict(rung_edges=[(0, 1), (2, 3), (1, 3), (0, 4)]),
+])
+def test_invalid_profiles_are_rejected(changes):
+    with pytest.raises(ValueError):
+        profile_with(**changes)
@@ -0,0 +1,65 @@
+import importlib.util
+import os
+import sys
+import types
+
+import numpy as np
+
+
+def load_move():
+    # parent_space() is plain numpy, bpy is only needed to define the operator.
+    # outside Blender a bare module is enough, other tests may have put one
+    # in place already
+    try:
+        import bpy
+    except ImportError:
+        bpy = types.ModuleType('bpy')
+        bpy.types = types.SimpleNamespace(Operator=object)
+        bpy.props = types.ModuleType('bpy.props')
+        sys.modules.update({'bpy': bpy, 'bpy.props': bpy.props})
+    for name in ('FloatVectorProperty', 'FloatProperty', 'IntProperty'):
+        if not hasattr(bpy.props, name):
+            setattr(bpy.props, name, lambda **kwargs: None)
+    path = os.path.join(os.path.dirname(__file__), '..', 'move_01.py')
+    spec = importlib.util.spec_from_file_location('move_01', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+move = load_move()
+
+
+def rotation(axis, angle):
+    axis = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    k = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    return np.eye(3) + np.sin(angle) * k + (1 - np.cos(angle)) * k.dot(k)
+
+
+def test_matches_the_inverse_for_invertible_matrices():
+    rng = np.random.RandomState(0)
+    space = rng.uniform(-2, 2, (50, 3, 3))
+    space[0] = np.eye(3)
+    space[1] = rotation((1, 2, 3), 0.7).dot(np.diag((2, 0.5, 3)))
+    delta = rng.uniform(-1, 1, (50, 3))
+    expected = np.array([np.linalg.inv(m).dot(d) for m, d in zip(space, delta)])
+    assert np.allclose(move.parent_space(space, delta), expected)
+
+
+def test_zero_scale_drops_only_that_axis():
+    # a parent rotated and scaled to zero along its local z axis: the child
+    # moves along the parent's x and y as usual and not at all along z
+    r = rotation((1, 1, 0), 0.5)
+    space = np.array([r.dot(np.diag((2, 4, 0))), np.diag((0, 0, 0))])
+    delta = np.array([r.dot((2, 4, 5)), (1, 2, 3)])
+    local = move.parent_space(space, delta)
+    assert np.allclose(local[0], (1, 1, 0))
+    assert np.allclose(local[1], 0)
+    # mapped back it is the displacement without its part along z
+    assert np.allclose(space[0].dot(local[0]), r.dot((2, 4, 0)))
+
+
+def test_each_object_uses_its_own_matrix():
+    space = np.array([np.eye(3), np.diag((2, 2, 2)), rotation((0, 0, 1), np.pi / 2)])
+    delta = np.array([(1, 0, 0)] * 3, dtype=np.float64)
+    assert np.allclose(move.parent_space(space, delta), [(1, 0, 0), (0.5, 0, 0), (0, -1, 0)])
@@ -0,0 +1,145 @@
+import importlib.util
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+
+def load_random_vcolors():
+    # like select_connect, the colors are computed by plain numpy and bpy is
+    # only needed to define the operator. outside Blender a bare module is
+    # enough, other tests may have put one in place already
+    try:
+        import bpy
+    except ImportError:
+        bpy = types.ModuleType('bpy')
+        bpy.types = types.SimpleNamespace(Operator=object)
+        bpy.props = types.ModuleType('bpy.props')
+        sys.modules.update({'bpy': bpy, 'bpy.props': bpy.props})
+    for name in ('IntProperty', 'EnumProperty', 'BoolProperty'):
+        if not hasattr(bpy.props, name):
+            setattr(bpy.props, name, lambda **kwargs: None)
+    path = os.path.join(os.path.dirname(__file__), '..', 'random_vcolors.py')
+    spec = importlib.util.spec_from_file_location('random_vcolors', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+rv = load_random_vcolors()
+
+# two islands: a strip of two quads and two triangles sharing an edge
+FACES = [(0, 1, 4, 3), (1, 2, 5, 4), (6, 7, 8), (7, 9, 8)]
+EDGES = [(0, 1), (1, 2), (3, 4), (4, 5), (0, 3), (1, 4), (2, 5), (6, 7), (7, 8), (8, 6), (7, 9), (9, 8)]
+ISLAND = [0, 0, 1, 1]
+
+
+def buffers(strategy, components=4, material=(0, 1, 1, 0)):
+    # the faces are stored in a different order than their loops, the way
+    # a mesh looks after faces were deleted and added again
+    order = [2, 0, 3, 1]
+    loop_vertex = [v for n in order for v in FACES[n]]
+    first = np.cumsum([0] + [len(FACES[n]) for n in order])
+    loop_start = np.empty(len(FACES), dtype=np.int32)
+    loop_start[order] = first[:-1]
+    data = {
+        'components': components,
+        'loops': len(loop_vertex),
+        'loop_start': loop_start,
+        'loop_total': np.array([len(f) for f in FACES], dtype=np.int32)}
+    if strategy == 'MATERIAL':
+        data['material_index'] = np.array(material, dtype=np.int32)
+    elif strategy == 'ISLAND':
+        data['vertices'] = 10
+        data['edges'] = np.array(EDGES, dtype=np.int32).ravel()
+        data['loop_vertex'] = np.array(loop_vertex, dtype=np.int32)
+    return data
+
+
+def face_colors(data, colors):
+    # the color of every face, checking that all its loops have the same color
+    colors = colors.reshape(-1, data['components'])
+    result = []
+    for start, total in zip(data['loop_start'], data['loop_total']):
+        loops = colors[start:start + total]
+        assert (loops == loops[0]).all()
+        result.append(loops[0])
+    return np.array(result)
+
+
+@pytest.mark.parametrize('strategy', ['FACE', 'ISLAND', 'MATERIAL'])
+@pytest.mark.parametrize('seed', [0, 1, 12345])
+def test_chunk_size_does_not_change_the_colors(monkeypatch, strategy, seed):
+    data = buffers(strategy)
+    expected = rv.loop_colors(data, strategy, seed)
+    assert expected.dtype == np.float32
+    assert len(expected) == data['loops'] * data['components']
+    for chunk in (1, 3):
+        monkeypatch.setattr(rv, 'CHUNK', chunk)
+        assert rv.loop_colors(data, strategy, seed).tobytes() == expected.tobytes()
+
+
+@pytest.mark.parametrize('strategy', ['FACE', 'ISLAND', 'MATERIAL'])
+def test_same_seed_same_colors(strategy):
+    data = buffers(strategy)
+    a = rv.loop_colors(data, strategy, 7)
+    assert rv.loop_colors(buffers(strategy), strategy, 7).tobytes() == a.tobytes()
+    assert rv.loop_colors(data, strategy, 8).tobytes() != a.tobytes()
+
+
+def test_every_face_gets_its_own_color():
+    data = buffers('FACE')
+    colors = face_colors(data, rv.loop_colors(data, 'FACE', 0))
+    assert len(np.unique(colors, axis=0)) == len(FACES)
+    # alpha is opaque, rgb is random
+    assert (colors[:, 3] == 1).all()
+    assert ((colors[:, :3] >= 0) & (colors[:, :3] < 1)).all()
+
+
+def test_rgb_layers():
+    data = buffers('FACE', components=3)
+    colors = rv.loop_colors(data, 'FACE', 0)
+    assert len(colors) == data['loops'] * 3
+    face_colors(data, colors)
+
+
+def test_islands_share_a_color():
+    data = buffers('ISLAND')
+    colors = face_colors(data, rv.loop_colors(data, 'ISLAND', 0))
+    assert (colors[0] == colors[1]).all()
+    assert (colors[2] == colors[3]).all()
+    assert (colors[0] != colors[2]).any()
+
+
+def test_materials_share_a_color():
+    data = buffers('MATERIAL')
+    colors = face_colors(data, rv.loop_colors(data, 'MATERIAL', 0))
+    assert (colors[0] == colors[3]).all()
+    assert (colors[1] == colors[2]).all()
+    assert (colors[0] != colors[1]).any()
+
+
+def test_face_keys():
+    keys, count = rv.face_keys(buffers('ISLAND'), 'ISLAND')
+    assert np.array_equal(keys, ISLAND) and count == 2
+    keys, count = rv.face_keys(buffers('MATERIAL', material=(0, 3, 3, 0)), 'MATERIAL')
+    assert np.array_equal(keys, [0, 3, 3, 0]) and count == 4
+
+
+def test_union_find_points_at_the_lowest_index():
+    # a chain that is joined from both ends, plus an isolated vertex
+    u = np.array([5, 3, 1, 4, 0])
+    v = np.array([4, 2, 2, 3, 7])
+    parent = rv.union_find(8, u, v)
+    assert np.array_equal(parent, [0, 1, 1, 1, 1, 1, 6, 0])
+
+
+def test_mesh_seed_depends_on_seed_and_name_only():
+    a = types.SimpleNamespace(name='Cube')
+    b = types.SimpleNamespace(name='Cube.001')
+    assert rv.mesh_seed(3, a) == rv.mesh_seed(3, types.SimpleNamespace(name='Cube'))
+    assert rv.mesh_seed(3, a) != rv.mesh_seed(3, b)
+    assert rv.mesh_seed(3, a) != rv.mesh_seed(4, a)
+    assert 0 <= rv.mesh_seed(2**32 - 1, b) < 2**32
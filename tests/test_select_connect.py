@@ -0,0 +1,129 @@
+import importlib.util
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+
+def load_select_connect():
+    # the add-on only needs bpy for registering the operator, the selection
+    # logic itself is plain numpy. outside Blender a bare module is enough
+    # to get past the imports, other tests may have put one in place already
+    try:
+        import bpy
+    except ImportError:
+        bpy = types.ModuleType('bpy')
+        bpy.types = types.SimpleNamespace(Operator=object)
+        bpy.props = types.ModuleType('bpy.props')
+        sys.modules.update({'bpy': bpy, 'bpy.props': bpy.props})
+    for name in ('IntProperty', 'FloatProperty', 'EnumProperty'):
+        if not hasattr(bpy.props, name):
+            setattr(bpy.props, name, lambda **kwargs: None)
+    if not hasattr(bpy, 'app'):
+        bpy.app = types.ModuleType('bpy.app')
+        bpy.app.handlers = types.ModuleType('bpy.app.handlers')
+        bpy.app.handlers.persistent = lambda f: f
+        sys.modules.update({'bpy.app': bpy.app, 'bpy.app.handlers': bpy.app.handlers})
+    path = os.path.join(os.path.dirname(__file__), '..', 'select_connect.py')
+    spec = importlib.util.spec_from_file_location('select_connect', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+sc = load_select_connect()
+
+
+class Collection:
+    """Just enough of a bpy collection for foreach_get"""
+
+    def __init__(self, n, **attributes):
+        self.n = n
+        self.attributes = attributes
+
+    def __len__(self):
+        return self.n
+
+    def foreach_get(self, attribute, out):
+        out[:] = np.asarray(self.attributes[attribute]).ravel()
+
+
+def grid(size=4):
+    # a size x size grid of quads, the left half material 0, the right half 1
+    def index(x, y):
+        return y * (size + 1) + x
+    co = [(x, y, 0) for y in range(size + 1) for x in range(size + 1)]
+    edges, edge_index, loop_vertex, loop_edge, material = [], {}, [], [], []
+    for y in range(size):
+        for x in range(size):
+            quad = (index(x, y), index(x + 1, y), index(x + 1, y + 1), index(x, y + 1))
+            for a, b in zip(quad, quad[1:] + quad[:1]):
+                key = (min(a, b), max(a, b))
+                if key not in edge_index:
+                    edge_index[key] = len(edges)
+                    edges.append(key)
+                loop_vertex.append(a)
+                loop_edge.append(edge_index[key])
+            material.append(0 if x < size // 2 else 1)
+    nfaces = size * size
+    nedges = len(edges)
+    me = types.SimpleNamespace(
+        vertices=Collection(len(co), co=co),
+        edges=Collection(nedges, vertices=edges, use_seam=[False] * nedges, use_edge_sharp=[False] * nedges),
+        polygons=Collection(nfaces, loop_start=range(0, 4 * nfaces, 4), loop_total=[4] * nfaces,
+                            material_index=material),
+        loops=Collection(4 * nfaces, vertex_index=loop_vertex, edge_index=loop_edge))
+    return me, np.array(co), np.array(edges)
+
+
+def select(me, kind, seed, delimit, mode='ALL'):
+    arrays = sc.MeshArrays(me)
+    nnodes, pairs = arrays.graph(kind)
+    topology = sc.Topology(nnodes, pairs)
+    selected = np.zeros(arrays.count(kind), dtype=bool)
+    selected[seed] = True
+    op = sc.SelectConnect.__new__(sc.SelectConnect)
+    op.mode, op.rings, op.radius, op.delimit = mode, 1, 1.0, delimit
+    return op.select(me, arrays, kind, topology, selected)
+
+
+@pytest.mark.parametrize('kind', ['VERT', 'EDGE', 'FACE'])
+def test_without_delimit_everything_is_connected(kind):
+    me, co, edges = grid()
+    assert select(me, kind, 0, set()).all()
+
+
+def test_vertex_delimit_stays_on_one_side():
+    me, co, edges = grid()
+    reached = select(me, 'VERT', 0, {'MATERIAL'})
+    assert reached.sum() == 15
+    assert (co[reached, 0] <= 2).all()
+
+
+def test_edge_delimit_stays_on_one_side():
+    me, co, edges = grid()
+    reached = select(me, 'EDGE', 0, {'MATERIAL'})
+    x = co[edges[reached], 0]
+    assert reached.any() and not reached.all()
+    # no selected edge reaches past the material boundary at x == 2
+    assert (x <= 2).all()
+    # every edge strictly inside the left half is found
+    left = (co[edges, 0] <= 2).all(axis=1) & ~(co[edges, 0] == 2).all(axis=1)
+    assert reached[left].all()
+
+
+def test_face_delimit_stays_on_one_side():
+    me, co, edges = grid()
+    reached = select(me, 'FACE', 0, {'MATERIAL'})
+    assert reached.sum() == 8
+    assert reached.reshape(4, 4)[:, :2].all()
+
+
+def test_rings_in_edge_mode():
+    me, co, edges = grid()
+    reached = select(me, 'EDGE', 0, set(), mode='RINGS')
+    # the edges sharing a vertex with the bottom left edge, and that edge
+    shared = np.isin(edges, edges[0]).any(axis=1)
+    assert np.array_equal(reached, shared)